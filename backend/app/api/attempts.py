@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_async_db
+from ..core.dependencies import get_current_active_user
+from ..core.pagination import decode_cursor, set_next_cursor
+from ..core.responses import json_response, schema_columns
+from ..models import QuizAttempt
+from ..schemas import AttemptSummary
+
+
+router = APIRouter()
+
+ATTEMPT_COLUMNS = schema_columns(QuizAttempt, AttemptSummary)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    # время без зоны считаем UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _history_owner(user, user_id: int | None, quiz_id: int | None) -> int | None:
+    """Whose attempts to list: None means every user (superusers, one quiz only)"""
+    if user_id is not None and user_id != user.id and not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    if user_id is None and not (user.is_superuser and quiz_id is not None):
+        return user.id
+    return user_id
+
+
+@router.get("/", response_model=list[AttemptSummary])
+async def list_attempts(
+    quiz_id: int | None = None,
+    user_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Attempt history, newest first, optionally for one quiz and a [since, until) range.
+
+    Defaults to the current user's attempts. Superusers may pass another
+    `user_id`, or only `quiz_id` to see every user's attempts at that quiz.
+    Pass the X-Next-Cursor header back as `cursor` for the next page.
+    Every filter is served by a (user_id | quiz_id, ..., started_at) index,
+    and the started_at bounds prune monthly partitions.
+    """
+    owner = _history_owner(user, user_id, quiz_id)
+    query = select(*ATTEMPT_COLUMNS)
+    if owner is not None:
+        query = query.where(QuizAttempt.user_id == owner)
+    if quiz_id is not None:
+        query = query.where(QuizAttempt.quiz_id == quiz_id)
+    if since is not None:
+        query = query.where(QuizAttempt.started_at >= _utc(since))
+    if until is not None:
+        query = query.where(QuizAttempt.started_at < _utc(until))
+    if cursor is not None:
+        micros, last_id = decode_cursor(cursor, 2)
+        last_started = _EPOCH + micros * _MICROSECOND
+        query = query.where(
+            QuizAttempt.started_at <= last_started,
+            tuple_(QuizAttempt.started_at, QuizAttempt.id) < (last_started, last_id),
+        )
+
+    rows = (await db.execute(
+        query.order_by(QuizAttempt.started_at.desc(), QuizAttempt.id.desc()).limit(limit)
+    )).all()
+    response = json_response([r._asdict() for r in rows])
+    set_next_cursor(
+        response, rows, limit,
+        key=lambda r: ((r.started_at - _EPOCH) // _MICROSECOND, r.id),
+    )
+    return response
+
+
+@router.get("/best/{quiz_id}", response_model=AttemptSummary)
+async def best_attempt(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Current user's best attempt at a quiz: most correct answers, then most XP, then earliest"""
+    row = (await db.execute(
+        select(*ATTEMPT_COLUMNS)
+        .where(QuizAttempt.user_id == user.id, QuizAttempt.quiz_id == quiz_id)
+        .order_by(
+            QuizAttempt.correct_questions.desc().nulls_last(),
+            QuizAttempt.score_earned.desc().nulls_last(),
+            QuizAttempt.started_at,
+        )
+        .limit(1)
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No attempts for this quiz")
+    return json_response(row._asdict())
@@ -1,44 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+import psycopg2
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.database import get_async_db, get_db
 from ..core.dependencies import get_current_active_user
-from ..models import Book as BookModel
+from ..core.pagination import decode_cursor, set_next_cursor
+from ..core.responses import json_response, schema_columns
+from ..models import Book as BookModel, DifficultyLevel
 from ..schemas import BookCreate, BookUpdate, Book as BookSchema
+from ..services.book_import import (
+    BookImportError,
+    detect_format,
+    import_book,
+    iter_chapters,
+    read_epub_metadata,
+)
 
 
 router = APIRouter()
 
+# Горячие GET отдают строки Core напрямую через orjson, без ORM и повторной валидации
+BOOK_COLUMNS = schema_columns(BookModel, BookSchema)
+
 
 @router.post("/", response_model=BookSchema, status_code=status.HTTP_201_CREATED)
-def create_book(
+async def create_book(
     book_in: BookCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
     book = BookModel(**book_in.model_dump())
     db.add(book)
-    db.commit()
-    db.refresh(book)
+    await db.commit()
+    await db.refresh(book)
     return book
 
 
+@router.post("/import", response_model=BookSchema, status_code=status.HTTP_201_CREATED)
+def import_book_file(
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    author: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    language: Optional[str] = Form(None),
+    genre: Optional[str] = Form(None),
+    difficulty: DifficultyLevel = Form(DifficultyLevel.INTERMEDIATE),
+    db: Session = Depends(get_db),
+    current=Depends(get_current_active_user),
+):
+    """Import a whole book from a TXT, Markdown or EPUB file (superuser only).
+
+    Chapters are split while streaming and loaded with COPY in one
+    transaction. Missing title/author/language are taken from EPUB metadata.
+    Sync on purpose: COPY goes through psycopg2 and runs in the threadpool.
+    """
+    if not current.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    try:
+        fmt = detect_format(file.filename or "")
+        meta = read_epub_metadata(file.file) if fmt == "epub" else None
+        fields = {
+            "title": title or (meta and meta.title),
+            "author": author or (meta and meta.author),
+            "description": description or (meta and meta.description),
+            "language": language or (meta and meta.language) or "ru",
+            "genre": genre,
+            "difficulty": difficulty,
+        }
+        if not fields["title"] or not fields["author"]:
+            raise BookImportError("title and author are required")
+        file.file.seek(0)
+        result = import_book(db, fields, iter_chapters(file.file, fmt))
+        db.commit()
+    except (BookImportError, psycopg2.Error) as exc:
+        # COPY идёт мимо SQLAlchemy, и его ошибки приходят сырыми psycopg2
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    return db.get(BookModel, result.book_id)
+
+
 @router.get("/{book_id}", response_model=BookSchema)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(BookModel).filter(BookModel.id == book_id).first()
+async def get_book(book_id: int, db: AsyncSession = Depends(get_async_db)):
+    book = (await db.execute(select(*BOOK_COLUMNS).where(BookModel.id == book_id))).first()
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
-    return book
+    return json_response(book._asdict())
 
 
 @router.put("/{book_id}", response_model=BookSchema)
-def update_book(
+async def update_book(
     book_id: int,
     book_in: BookUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
-    book = db.query(BookModel).filter(BookModel.id == book_id).first()
+    book = await db.get(BookModel, book_id)
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
@@ -46,28 +107,42 @@ def update_book(
         setattr(book, field, value)
 
     db.add(book)
-    db.commit()
-    db.refresh(book)
+    await db.commit()
+    await db.refresh(book)
     return book
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_book(
+async def delete_book(
     book_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
-    book = db.query(BookModel).filter(BookModel.id == book_id).first()
+    book = await db.get(BookModel, book_id)
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
-    db.delete(book)
-    db.commit()
+    await db.delete(book)
+    await db.commit()
     return None
 
 
 @router.get("/", response_model=list[BookSchema])
-def list_books(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
-    books = db.query(BookModel).offset(skip).limit(limit).all()
-    return books
+async def list_books(
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List books by id; pass the X-Next-Cursor header back as `cursor` for the next page"""
+    query = select(*BOOK_COLUMNS).order_by(BookModel.id)
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(BookModel.id > last_id)
+    else:
+        query = query.offset(skip)
+    books = (await db.execute(query.limit(limit))).all()
+    response = json_response([b._asdict() for b in books])
+    set_next_cursor(response, books, limit, key=lambda b: (b.id,))
+    return response
 
 
@@ -1,49 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import LargeBinary, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.dependencies import get_current_active_user
+from ..core.pagination import decode_cursor, set_next_cursor
+from ..core.responses import json_response, schema_columns
 from ..models import Chapter as ChapterModel, Book as BookModel
-from ..schemas import ChapterCreate, ChapterUpdate, Chapter as ChapterSchema
+from ..schemas import ChapterCreate, ChapterUpdate, Chapter as ChapterSchema, ChapterSummary
+from ..services.quiz_payload import invalidate_quiz_payload
 
 
 router = APIRouter()
 
+CHAPTER_COLUMNS = schema_columns(ChapterModel, ChapterSchema)
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _chapter_page_query(
+    query: Select,
+    book_id: int | None,
+    skip: int,
+    cursor: str | None,
+) -> Select:
+    key_columns = (ChapterModel.book_id, ChapterModel.chapter_number, ChapterModel.id)
+    query = query.order_by(*key_columns)
+    if book_id is not None:
+        query = query.where(ChapterModel.book_id == book_id)
+    if cursor is not None:
+        query = query.where(tuple_(*key_columns) > tuple_(*decode_cursor(cursor, 3)))
+    else:
+        query = query.offset(skip)
+    return query
+
+
+def _chapter_key(chapter) -> tuple:
+    return (chapter.book_id, chapter.chapter_number, chapter.id)
+
+
+def _parse_range(header: str | None, total: int) -> tuple[int, int] | None:
+    """Resolve a single ``bytes=`` range to inclusive (start, end); None means the whole body"""
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        # несколько диапазонов и прочие единицы не поддерживаем: отдаём всё тело
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, total - int(last)), total - 1
+    else:
+        start = int(first)
+        end = min(int(last), total - 1) if last else total - 1
+    if start >= total or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{total}"},
+        )
+    return start, end
+
 
 @router.post("/", response_model=ChapterSchema, status_code=status.HTTP_201_CREATED)
-def create_chapter(
+async def create_chapter(
     chapter_in: ChapterCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
     # ensure book exists
-    book = db.query(BookModel).filter(BookModel.id == chapter_in.book_id).first()
+    book = await db.get(BookModel, chapter_in.book_id)
     if not book:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
     chapter = ChapterModel(**chapter_in.model_dump())
     db.add(chapter)
-    db.commit()
-    db.refresh(chapter)
+    await db.commit()
+    await db.refresh(chapter)
     return chapter
 
 
+@router.get("/summary", response_model=list[ChapterSummary])
+async def list_chapter_summaries(
+    response: Response,
+    book_id: int | None = None,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Table of contents: same paging as list_chapters, without loading `content`"""
+    query = _chapter_page_query(
+        select(ChapterModel).options(defer(ChapterModel.content)), book_id, skip, cursor
+    )
+    chapters = (await db.scalars(query.limit(limit))).all()
+    set_next_cursor(response, chapters, limit, key=_chapter_key)
+    return chapters
+
+
+@router.get("/{chapter_id}/content")
+async def get_chapter_content(
+    chapter_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Chapter text as UTF-8 bytes, with single-range `Range`/`If-Range` support"""
+    meta = (await db.execute(
+        select(ChapterModel.content_bytes, ChapterModel.content_md5).where(ChapterModel.id == chapter_id)
+    )).first()
+    if meta is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
+    total, digest = meta
+    etag = f'"{digest}"'
+
+    byte_range = _parse_range(request.headers.get("range"), total)
+    if_range = request.headers.get("if-range")
+    if byte_range is not None and if_range is not None and if_range != etag:
+        byte_range = None
+    start, end = byte_range if byte_range is not None else (0, total - 1)
+
+    # режем байты на стороне Postgres, чтобы не тянуть всю главу ради первого экрана;
+    # срез приходит одним значением, поэтому и отдаётся обычным Response
+    body = b""
+    if total > 0:
+        body = await db.scalar(
+            select(
+                func.substring(
+                    func.convert_to(ChapterModel.content, "UTF8"), start + 1, end - start + 1,
+                    type_=LargeBinary,
+                )
+            ).where(ChapterModel.id == chapter_id)
+        )
+
+    headers = {"Accept-Ranges": "bytes", "ETag": etag}
+    status_code = status.HTTP_200_OK
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return Response(content=body, status_code=status_code, media_type="text/plain; charset=utf-8", headers=headers)
+
+
 @router.get("/{chapter_id}", response_model=ChapterSchema)
-def get_chapter(chapter_id: int, db: Session = Depends(get_db)):
-    chapter = db.query(ChapterModel).filter(ChapterModel.id == chapter_id).first()
+async def get_chapter(chapter_id: int, db: AsyncSession = Depends(get_async_db)):
+    chapter = (await db.execute(select(*CHAPTER_COLUMNS).where(ChapterModel.id == chapter_id))).first()
     if not chapter:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
-    return chapter
+    return json_response(chapter._asdict())
 
 
 @router.put("/{chapter_id}", response_model=ChapterSchema)
-def update_chapter(
+async def update_chapter(
     chapter_id: int,
     chapter_in: ChapterUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
-    chapter = db.query(ChapterModel).filter(ChapterModel.id == chapter_id).first()
+    chapter = await db.get(ChapterModel, chapter_id)
     if not chapter:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
 
@@ -51,36 +164,41 @@ def update_chapter(
         setattr(chapter, field, value)
 
     db.add(chapter)
-    db.commit()
-    db.refresh(chapter)
+    await db.commit()
+    invalidate_quiz_payload(chapter_id)
+    await db.refresh(chapter)
     return chapter
 
 
 @router.delete("/{chapter_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_chapter(
+async def delete_chapter(
     chapter_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(get_current_active_user),
 ):
-    chapter = db.query(ChapterModel).filter(ChapterModel.id == chapter_id).first()
+    chapter = await db.get(ChapterModel, chapter_id)
     if not chapter:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
-    db.delete(chapter)
-    db.commit()
+    await db.delete(chapter)
+    await db.commit()
+    # тест удалённой главы из кэша больше не отдаём
+    invalidate_quiz_payload(chapter_id)
     return None
 
 
 @router.get("/", response_model=list[ChapterSchema])
-def list_chapters(
+async def list_chapters(
     book_id: int | None = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(ChapterModel)
-    if book_id is not None:
-        query = query.filter(ChapterModel.book_id == book_id)
-    chapters = query.offset(skip).limit(limit).all()
-    return chapters
+    """List chapters by (book_id, chapter_number); pass X-Next-Cursor back as `cursor`"""
+    query = _chapter_page_query(select(*CHAPTER_COLUMNS), book_id, skip, cursor)
+    chapters = (await db.execute(query.limit(limit))).all()
+    response = json_response([c._asdict() for c in chapters])
+    set_next_cursor(response, chapters, limit, key=_chapter_key)
+    return response
 
 
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..core.database import database_pool_status
+from ..core.dependencies import get_current_active_user
+from ..core.hashing import hashing_stats
+
+
+router = APIRouter()
+
+
+async def require_superuser(user=Depends(get_current_active_user)):
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return user
+
+
+@router.get("/hashing")
+def get_hashing_stats(_=Depends(require_superuser)):
+    """Password hashing pool: rejections, timeouts, queue wait and hash time histograms"""
+    return hashing_stats()
+
+
+@router.get("/pool")
+async def get_pool_stats(_=Depends(require_superuser)):
+    """Connection pools of this worker: usage, overflow, checkout wait histogram, timeouts"""
+    return database_pool_status()
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_async_db
+from ..core.dependencies import get_current_active_user
+from ..models import User as UserModel
+from ..schemas import LeaderboardEntry, LeaderboardRank
+from ..services.leaderboard import ensure_leaderboard
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(get_current_active_user),
+):
+    """Top users by total XP"""
+    board = await ensure_leaderboard(db)
+    top = board.top(limit)
+    if not top:
+        return []
+
+    rows = await db.execute(
+        select(UserModel.id, UserModel.username, UserModel.level)
+        .where(UserModel.id.in_([user_id for _, user_id, _ in top]))
+    )
+    profiles = {row.id: row for row in rows}
+    return [
+        LeaderboardEntry(
+            rank=rank,
+            user_id=user_id,
+            username=profiles[user_id].username,
+            level=profiles[user_id].level,
+            total_xp=total_xp,
+        )
+        for rank, user_id, total_xp in top
+        if user_id in profiles
+    ]
+
+
+@router.get("/me", response_model=LeaderboardRank)
+async def get_my_rank(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Current user's rank, answered from the in-memory board in O(log n)"""
+    board = await ensure_leaderboard(db)
+    rank = board.rank(user.id)
+    if rank is None:
+        # зарегистрировался после последней загрузки доски
+        board.update(user.id, user.total_xp)
+        rank = board.rank(user.id)
+    return LeaderboardRank(
+        user_id=user.id,
+        rank=rank,
+        total_xp=user.total_xp or 0,
+        total_users=len(board),
+    )
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_async_db
+from ..core.dependencies import get_current_active_user
+from ..schemas import (
+    ReadingProgressCreate,
+    ReadingProgressUpdate,
+    ReadingProgress as ProgressSchema,
+    ReadingProgressWithBook,
+)
+from ..services.progress import PROGRESS_STATUSES, upsert_progress, get_library
+
+
+router = APIRouter()
+
+
+async def _save(db: AsyncSession, user_id: int, book_id: int, fields: dict | None = None):
+    try:
+        row = await upsert_progress(db, user_id, book_id, fields)
+        await db.commit()
+    except IntegrityError:
+        # единственный FK, который может не сойтись у текущего пользователя, — book_id
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+    return row
+
+
+@router.get("/", response_model=list[ReadingProgressWithBook])
+async def my_library(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Current user's books with progress, most recently read first"""
+    return await get_library(db, user.id)
+
+
+@router.post("/", response_model=ProgressSchema)
+async def start_reading(
+    progress_in: ReadingProgressCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Add a book to the library; an existing entry only gets its last_read_at bumped"""
+    return await _save(db, user.id, progress_in.book_id)
+
+
+@router.put("/{book_id}", response_model=ProgressSchema)
+async def update_progress(
+    book_id: int,
+    progress_in: ReadingProgressUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    fields = progress_in.model_dump(exclude_unset=True, exclude_none=True)
+    if "status" in fields and fields["status"] not in PROGRESS_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Status must be one of: {', '.join(PROGRESS_STATUSES)}",
+        )
+    return await _save(db, user.id, book_id, fields)
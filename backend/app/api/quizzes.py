@@ -1,310 +1,440 @@
+from datetime import datetime, timezone
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from ..core.database import get_db
+from ..core.config import settings
+from ..core.database import get_async_db
 from ..core.dependencies import get_current_active_user
+from ..core.responses import json_response
+from ..core.user_cache import invalidate_user
 from ..models import (
     Quiz as QuizModel,
     Question as QuestionModel,
     Option as OptionModel,
+    Chapter as ChapterModel,
 )
 from ..schemas import (
-    QuizCreate, QuizUpdate, Quiz as QuizSchema,
+    QuizCreate, QuizUpdate, Quiz as QuizSchema, QuizTree,
     QuestionCreate, QuestionUpdate, Question as QuestionSchema,
     OptionCreate, OptionUpdate, Option as OptionSchema,
-    QuizSubmission, QuizResult, QuestionResult,
+    QuizSubmission, QuizResult, QuestionResult, QuizStats,
 )
+from ..schemas.quiz import QuestionSubmission
+from ..services.attempt_writer import enqueue_attempt, save_attempt
 from ..services.grading import grade_question
-from ..services.xp import compute_quiz_xp, apply_quiz_result
-from datetime import datetime
+from ..services.answer_key import get_answer_key, invalidate_answer_key
+from ..services.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    REPLAY_HEADER,
+    claim_key,
+    request_fingerprint,
+    store_result,
+)
+from ..services.leaderboard import leaderboard
+from ..services.item_stats import record_item_stats, quiz_item_stats
+from ..services.quiz_authoring import validate_quiz_tree, save_quiz_tree
+from ..services.quiz_payload import load_quiz_tree, get_quiz_payload, invalidate_quiz_payload
+from ..services.xp import quiz_base_xp, apply_quiz_result
+from ..services.progress import record_chapter_passed
 
 
 router = APIRouter()
 
 
+def _invalidate_quiz(quiz_id: int, chapter_id: int) -> None:
+    invalidate_answer_key(quiz_id)
+    invalidate_quiz_payload(chapter_id)
+
+
+async def _question_parents(db: AsyncSession, question_id: int) -> tuple[int, int]:
+    """Return (quiz_id, chapter_id) of a question without lazy loads"""
+    row = (await db.execute(
+        select(QuizModel.id, QuizModel.chapter_id)
+        .join(QuestionModel, QuestionModel.quiz_id == QuizModel.id)
+        .where(QuestionModel.id == question_id)
+    )).one()
+    return row.id, row.chapter_id
+
+
+async def _load_question(db: AsyncSession, question_id: int) -> QuestionModel | None:
+    return await db.scalar(
+        select(QuestionModel)
+        .options(selectinload(QuestionModel.options))
+        .where(QuestionModel.id == question_id)
+    )
+
+
 # Admin CRUD
 
 @router.post("/", response_model=QuizSchema, status_code=status.HTTP_201_CREATED)
-def create_quiz(
+async def create_quiz(
     quiz_in: QuizCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     quiz = QuizModel(**quiz_in.model_dump())
     db.add(quiz)
-    db.commit()
-    db.refresh(quiz)
-    return quiz
+    await db.commit()
+    return await load_quiz_tree(db, QuizModel.id == quiz.id)
 
 
 @router.put("/{quiz_id}", response_model=QuizSchema)
-def update_quiz(
+async def update_quiz(
     quiz_id: int,
     quiz_in: QuizUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
+    quiz = await load_quiz_tree(db, QuizModel.id == quiz_id)
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     for field, value in quiz_in.model_dump(exclude_unset=True).items():
         setattr(quiz, field, value)
     db.add(quiz)
-    db.commit()
-    db.refresh(quiz)
+    await db.commit()
+    _invalidate_quiz(quiz_id, quiz.chapter_id)
+    await db.refresh(quiz, attribute_names=["updated_at"])
     return quiz
 
 
+@router.put("/by-chapter/{chapter_id}/tree", response_model=QuizSchema)
+async def put_quiz_tree(
+    chapter_id: int,
+    tree: QuizTree,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Create or replace the whole quiz of a chapter (questions and options) in one transaction.
+
+    Questions/options with an id are updated in place, ones without are
+    inserted, and existing ones left out of the document are deleted.
+    """
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    errors = validate_quiz_tree(tree)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+    quiz_id = await save_quiz_tree(db, chapter_id, tree)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
+    return await load_quiz_tree(db, QuizModel.id == quiz_id)
+
+
 @router.delete("/{quiz_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_quiz(
+async def delete_quiz(
     quiz_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
+    quiz = await db.get(QuizModel, quiz_id)
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    db.delete(quiz)
-    db.commit()
+    chapter_id = quiz.chapter_id
+    await db.delete(quiz)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
     return None
 
 
 @router.post("/{quiz_id}/questions", response_model=QuestionSchema, status_code=status.HTTP_201_CREATED)
-def create_question(
+async def create_question(
     quiz_id: int,
     q_in: QuestionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
+    quiz = await db.get(QuizModel, quiz_id)
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
     q = QuestionModel(quiz_id=quiz_id, **q_in.model_dump())
     db.add(q)
-    db.commit()
-    db.refresh(q)
-    return q
+    await db.commit()
+    _invalidate_quiz(quiz_id, quiz.chapter_id)
+    return await _load_question(db, q.id)
 
 
 @router.put("/questions/{question_id}", response_model=QuestionSchema)
-def update_question(
+async def update_question(
     question_id: int,
     q_in: QuestionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    q = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+    q = await _load_question(db, question_id)
     if not q:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     for field, value in q_in.model_dump(exclude_unset=True).items():
         setattr(q, field, value)
+    quiz_id, chapter_id = await _question_parents(db, question_id)
     db.add(q)
-    db.commit()
-    db.refresh(q)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
     return q
 
 
 @router.delete("/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_question(
+async def delete_question(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    q = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+    q = await db.get(QuestionModel, question_id)
     if not q:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
-    db.delete(q)
-    db.commit()
+    quiz_id, chapter_id = await _question_parents(db, question_id)
+    await db.delete(q)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
     return None
 
 
 @router.post("/questions/{question_id}/options", response_model=OptionSchema, status_code=status.HTTP_201_CREATED)
-def create_option(
+async def create_option(
     question_id: int,
     o_in: OptionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    q = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+    q = await db.get(QuestionModel, question_id)
     if not q:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     o = OptionModel(question_id=question_id, **o_in.model_dump())
     db.add(o)
-    db.commit()
-    db.refresh(o)
+    await db.commit()
+    _invalidate_quiz(*await _question_parents(db, question_id))
     return o
 
 
 @router.put("/options/{option_id}", response_model=OptionSchema)
-def update_option(
+async def update_option(
     option_id: int,
     o_in: OptionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    o = db.query(OptionModel).filter(OptionModel.id == option_id).first()
+    o = await db.get(OptionModel, option_id)
     if not o:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Option not found")
     for field, value in o_in.model_dump(exclude_unset=True).items():
         setattr(o, field, value)
+    quiz_id, chapter_id = await _question_parents(db, o.question_id)
     db.add(o)
-    db.commit()
-    db.refresh(o)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
     return o
 
 
 @router.delete("/options/{option_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_option(
+async def delete_option(
     option_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
     if not user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    o = db.query(OptionModel).filter(OptionModel.id == option_id).first()
+    o = await db.get(OptionModel, option_id)
     if not o:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Option not found")
-    db.delete(o)
-    db.commit()
+    quiz_id, chapter_id = await _question_parents(db, o.question_id)
+    await db.delete(o)
+    await db.commit()
+    _invalidate_quiz(quiz_id, chapter_id)
     return None
 
 
+@router.get("/{quiz_id}/stats", response_model=QuizStats)
+async def get_quiz_stats(
+    quiz_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    """Per-question difficulty/discrimination and option pick rates, read from running counters"""
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    if await db.get(QuizModel, quiz_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+    return {"quiz_id": quiz_id, "questions": await quiz_item_stats(db, quiz_id)}
+
+
 # Public endpoints
 
 @router.get("/by-chapter/{chapter_id}", response_model=QuizSchema)
-def get_quiz_by_chapter(chapter_id: int, db: Session = Depends(get_db), _=Depends(get_current_active_user)):
-    quiz = db.query(QuizModel).filter(QuizModel.chapter_id == chapter_id, QuizModel.is_active == True).first()
-    if not quiz:
+async def get_quiz_by_chapter(
+    chapter_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_active_user),
+):
+    # админка получает полное дерево с is_correct, без кэша
+    if user.is_superuser:
+        quiz = await load_quiz_tree(db, QuizModel.chapter_id == chapter_id)
+        if not quiz:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+        return quiz
+
+    # для учеников — готовый JSON без is_correct из кэша, с ETag
+    payload = await get_quiz_payload(db, chapter_id)
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    # скрыть ответы в options: pydantic схема уже не требует is_correct на выдачу
-    return quiz
+    headers = {"ETag": payload.etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if payload.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+def _submission_payload(qsub: QuestionSubmission) -> dict:
+    """Extract the answer fields relevant for the question type"""
+    payload = {}
+    if qsub.type.name.lower() in ("single_choice", "multi_choice"):
+        if qsub.single_multi:
+            payload["selected_option_ids"] = qsub.single_multi.selected_option_ids
+    elif qsub.type.name.lower() == "ordering":
+        if qsub.ordering:
+            payload["ordering"] = qsub.ordering.ordering
+    elif qsub.type.name.lower() == "matching":
+        if qsub.matching:
+            payload["matches"] = qsub.matching.matches
+    return payload
 
 
 @router.post("/{quiz_id}/submit", response_model=QuizResult)
-def submit_quiz(
+async def submit_quiz(
     quiz_id: int,
     submission: QuizSubmission,
-    db: Session = Depends(get_db),
+    request: Request,
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_active_user),
 ):
-    quiz = db.query(QuizModel).filter(QuizModel.id == quiz_id).first()
+    """Grade a submission and record the attempt, XP, progress and item statistics in one transaction.
+
+    With an Idempotency-Key header a retry of the same submission gets the
+    stored result back (marked with Idempotent-Replayed) instead of a second
+    attempt and second XP grant; reusing a key for another body is a 422.
+    """
+    if idempotency_key is not None:
+        request_hash = request_fingerprint("POST", request.url.path, submission.model_dump(mode="json"))
+        stored = await claim_key(db, user.id, idempotency_key, request_hash)
+        if stored is not None:
+            return json_response(stored.response, status_code=stored.status_code, headers={REPLAY_HEADER: "true"})
+
+    quiz = await db.scalar(
+        select(QuizModel)
+        .options(joinedload(QuizModel.chapter).joinedload(ChapterModel.book))
+        .where(QuizModel.id == quiz_id)
+    )
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
 
-    # Собираем вопросы словарём
-    q_map = {q.id: q for q in quiz.questions}
+    # Скомпилированный ключ ответов из кэша: без загрузки опций и сортировок
+    q_map = (await get_answer_key(db, quiz.id)).questions
     results: list[QuestionResult] = []
+    answer_rows: list[dict] = []
+    graded: list[tuple] = []
     correct_count = 0
-    total = len(quiz.questions)
+    total = len(q_map)
 
     # Оценка по каждому ответу
     for qsub in submission.answers:
         q = q_map.get(qsub.question_id)
         if not q:
             continue
-        payload = {}
-        if qsub.type.name.lower() in ("single_choice", "multi_choice"):
-            if qsub.single_multi:
-                payload["selected_option_ids"] = qsub.single_multi.selected_option_ids
-        elif qsub.type.name.lower() == "ordering":
-            if qsub.ordering:
-                payload["ordering"] = qsub.ordering.ordering
-        elif qsub.type.name.lower() == "matching":
-            if qsub.matching:
-                payload["matches"] = qsub.matching.matches
+        payload = _submission_payload(qsub)
 
         is_correct = grade_question(q, payload)
         results.append(QuestionResult(question_id=q.id, correct=is_correct))
+        graded.append((q, payload, is_correct))
         if is_correct:
             correct_count += 1
 
+        answer_rows.append({
+            "question_id": q.id,
+            "selected_option_ids": payload.get("selected_option_ids"),
+            "ordering": payload.get("ordering"),
+            "matches": payload.get("matches"),
+        })
+
     is_perfect = total > 0 and correct_count == total
-    xp_earned = compute_quiz_xp(quiz, is_perfect, user)
-
-    # Применяем результат пользователю
-    apply_quiz_result(db, user, quiz, is_perfect, xp_earned)
-
-    # Update reading progress
-    from ..models import ReadingProgress as ProgressModel
-    progress = db.query(ProgressModel).filter(
-        ProgressModel.user_id == user.id,
-        ProgressModel.book_id == quiz.chapter.book_id
-    ).first()
-
-    if progress and is_perfect:
-        # Move to next chapter if quiz passed
-        if quiz.chapter.chapter_number > progress.chapters_completed:
-            progress.chapters_completed = quiz.chapter.chapter_number
-            progress.current_chapter = min(
-                quiz.chapter.chapter_number + 1,
-                quiz.chapter.book.total_chapters
-            )
-        
-        # Check if book completed
-        if progress.chapters_completed >= quiz.chapter.book.total_chapters:
-            progress.status = "completed"
-            progress.completed_at = datetime.utcnow()
-        
-        progress.last_read_at = datetime.utcnow()
-        db.add(progress)
-
-    # Сохраняем попытку
-    from ..models import QuizAttempt, Answer
-    attempt = QuizAttempt(
-        user_id=user.id,
-        quiz_id=quiz.id,
-        is_perfect=is_perfect,
-        score_earned=xp_earned,
-        total_questions=total,
-        correct_questions=correct_count,
-    )
-    db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
-
-    # Ответы
-    for r in submission.answers:
-        payload = {}
-        if r.single_multi:
-            payload["selected_option_ids"] = r.single_multi.selected_option_ids
-        if r.ordering:
-            payload["ordering"] = r.ordering.ordering
-        if r.matching:
-            payload["matches"] = r.matching.matches
-        ans = Answer(
-            attempt_id=attempt.id,
-            question_id=r.question_id,
-            selected_option_ids=payload.get("selected_option_ids"),
-            ordering=payload.get("ordering"),
-            matches=payload.get("matches"),
-        )
-        db.add(ans)
 
-    db.commit()
+    # Всё ниже пишется одной транзакцией: XP, прогресс, попытка и ответы, статистика вопросов
+
+    # Серия, XP с бонусом за серию и уровень — одним атомарным UPDATE ... RETURNING
+    outcome = await apply_quiz_result(db, user.id, quiz_base_xp(quiz), is_perfect)
+    xp_earned = outcome["xp_earned"]
+
+    # Прогресс чтения: upsert, строка создаётся при первом пройденном тесте
+    if is_perfect:
+        await record_chapter_passed(
+            db,
+            user.id,
+            quiz.chapter.book_id,
+            quiz.chapter.chapter_number,
+            quiz.chapter.book.total_chapters,
+        )
 
-    return QuizResult(
+    # started_at ставим сами: это ключ секции ответов, и при write-behind
+    # попытка датируется моментом отправки, а не моментом записи
+    attempt_row = {
+        "user_id": user.id,
+        "quiz_id": quiz.id,
+        "started_at": datetime.now(timezone.utc),
+        "is_perfect": is_perfect,
+        "score_earned": xp_earned,
+        "total_questions": total,
+        "correct_questions": correct_count,
+    }
+    if not settings.WRITE_BEHIND_ENABLED:
+        await save_attempt(db, attempt_row, answer_rows)
+
+    result = QuizResult(
         total_questions=total,
         correct_questions=correct_count,
         is_perfect=is_perfect,
         xp_earned=xp_earned,
         question_results=results,
     )
+    # Результат для повторов фиксируется тем же коммитом, что и XP
+    if idempotency_key is not None:
+        await store_result(db, user.id, idempotency_key, status.HTTP_200_OK, result.model_dump(mode="json"))
+
+    # Счётчики статистики вопросов — последним запросом перед коммитом: строки популярных
+    # вопросов общие для всех отправок, так их блокировка держится только до COMMIT.
+    # Порядок блокировок одинаковый (record_item_stats сортирует ключи), дедлоков нет
+    if total:
+        await record_item_stats(db, q_map.values(), graded, correct_count / total)
+
+    await db.commit()
+    # Снимок пользователя и рейтинг обновляем только после коммита: иначе параллельный
+    # запрос увидит XP и уровень, которые ещё могут откатиться
+    invalidate_user(user.id)
+    leaderboard.update(user.id, outcome["total_xp"])
+
+    # Write-behind: попытка и ответы уходят в очередь после коммита XP.
+    # Очередь полна или писатель останавливается — пишем сами, отдельной транзакцией.
+    if settings.WRITE_BEHIND_ENABLED and not enqueue_attempt(attempt_row, answer_rows):
+        await save_attempt(db, attempt_row, answer_rows)
+        await db.commit()
+    return result
 
 
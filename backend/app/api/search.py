@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_async_db
+from ..schemas import SearchResults, Suggestion
+from ..services.search import search_books, search_chapters, autocomplete
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    book_id: int | None = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ranked full-text search over books and chapters, with highlighted chapter snippets"""
+    books = [] if book_id is not None else await search_books(db, q, limit)
+    chapters = await search_chapters(db, q, limit, book_id=book_id)
+    return {"books": books, "chapters": chapters}
+
+
+@router.get("/autocomplete", response_model=list[Suggestion])
+async def search_autocomplete(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Typo-tolerant title/author suggestions"""
+    return await autocomplete(db, q, limit)
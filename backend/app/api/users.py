@@ -1,22 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db
 from ..core.dependencies import get_current_active_user
-from ..core.security import get_password_hash
+from ..core.pagination import decode_cursor, set_next_cursor
+from ..core.hashing import hash_password
+from ..core.user_cache import invalidate_user
 from ..models import User as UserModel
-from ..schemas import UserResponse, UserUpdate
+from ..schemas import UserResponse, UserUpdate, XPGrantBatch, XPGrantBatchResult
+from ..services.xp import grant_xp_batch
+from ..services.leaderboard import leaderboard
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[UserResponse])
-def list_users(skip: int = 0, limit: int = 20, db: Session = Depends(get_db), _=Depends(get_current_active_user)):
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+def list_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    _=Depends(get_current_active_user),
+):
+    """List users by id; pass the X-Next-Cursor header back as `cursor` for the next page"""
+    query = db.query(UserModel).order_by(UserModel.id)
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.filter(UserModel.id > last_id)
+    else:
+        query = query.offset(skip)
+    users = query.limit(limit).all()
+    set_next_cursor(response, users, limit, key=lambda u: (u.id,))
     return users
 
 
+@router.post("/xp-grants", response_model=XPGrantBatchResult)
+def grant_xp(
+    batch: XPGrantBatch,
+    db: Session = Depends(get_db),
+    current=Depends(get_current_active_user),
+):
+    """Grant XP to many users at once with a single bulk UPDATE"""
+    if not current.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    awards: dict[int, int] = {}
+    for grant in batch.grants:
+        awards[grant.user_id] = awards.get(grant.user_id, 0) + grant.xp
+
+    updated = grant_xp_batch(db, awards)
+    db.commit()
+    for row in updated:
+        invalidate_user(row["user_id"])
+        leaderboard.update(row["user_id"], row["total_xp"])
+
+    updated_ids = {row["user_id"] for row in updated}
+    return {
+        "updated": updated,
+        "missing_user_ids": [user_id for user_id in awards if user_id not in updated_ids],
+    }
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(user_id: int, db: Session = Depends(get_db), _=Depends(get_current_active_user)):
     user = db.query(UserModel).filter(UserModel.id == user_id).first()
@@ -56,14 +102,19 @@ def update_user(
     # hash password if provided
     if "password" in update_data and update_data["password"]:
         update_data.pop("password")
-        user.hashed_password = get_password_hash(user_in.password)  # type: ignore[arg-type]
+        user.hashed_password = hash_password(user_in.password)  # type: ignore[arg-type]
 
     for field, value in update_data.items():
         setattr(user, field, value)
 
     db.add(user)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
+    if user.is_active:
+        leaderboard.update(user.id, user.total_xp)
+    else:
+        leaderboard.remove(user.id)
     return user
 
 
@@ -74,6 +125,8 @@ def delete_user(user_id: int, db: Session = Depends(get_db), _=Depends(get_curre
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
+    leaderboard.remove(user_id)
     return None
 
 
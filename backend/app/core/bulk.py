@@ -0,0 +1,59 @@
+import io
+from typing import Any, Iterable, Iterator, Sequence
+from sqlalchemy.engine import Connection
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_field(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class CopyStream(io.RawIOBase):
+    """Readable file object that encodes rows to COPY text format on demand.
+
+    psycopg2 pulls it in fixed-size reads, so only the row being encoded and
+    one read buffer are held in memory no matter how many rows there are.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows: Iterator[Sequence[Any]] = iter(rows)
+        self._line = b""
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        written = 0
+        while written < len(b):
+            if self._pos == len(self._line):
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                self._line = ("\t".join(map(_copy_field, row)) + "\n").encode("utf-8")
+                self._pos = 0
+            n = min(len(b) - written, len(self._line) - self._pos)
+            b[written:written + n] = self._line[self._pos:self._pos + n]
+            self._pos += n
+            written += n
+        return written
+
+
+def copy_rows(connection: Connection, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """Stream rows into a table with COPY FROM STDIN on the connection's transaction.
+
+    Works on the sync (psycopg2) engine only. Returns the number of rows copied.
+    """
+    stream = CopyStream(rows)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(sql, stream, size=64 * 1024)
+        return cursor.rowcount
+    finally:
+        cursor.close()
@@ -17,11 +17,31 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    # Connection pools, applied to both the sync and the async engine.
+    # Per worker the ceiling is 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = True
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production-make-it-long-and-random"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+
+    # Password hashing (None = passlib defaults / CPU count)
+    ARGON2_TIME_COST: Optional[int] = None
+    ARGON2_MEMORY_COST: Optional[int] = None  # KiB
+    ARGON2_PARALLELISM: Optional[int] = None
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 5.0
     
     # CORS
     BACKEND_CORS_ORIGINS: list = ["*"]  # В продакшене поменяй на конкретные домены
@@ -30,6 +50,37 @@ class Settings(BaseSettings):
     QUIZ_BASE_XP: int = 100
     STREAK_STEP: int = 3
     STREAK_BONUS_XP: int = 50
+
+    # Caches
+    ANSWER_KEY_CACHE_SIZE: int = 1024
+    # Правка теста сбрасывает кэш только в своём воркере; в остальных ключ живёт не дольше TTL
+    ANSWER_KEY_CACHE_TTL_SECONDS: int = 30
+    QUIZ_PAYLOAD_CACHE_SIZE: int = 1024
+    QUIZ_PAYLOAD_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_TTL_SECONDS: int = 30
+    LEADERBOARD_REFRESH_SECONDS: int = 300
+
+    # Monthly partitions of quiz_attempts/answers (python -m scripts.partitions)
+    ATTEMPT_PARTITIONS_AHEAD: int = 3  # месяцев вперёд от текущего
+    ATTEMPT_RETENTION_MONTHS: Optional[int] = None  # None — хранить всю историю
+
+    # Idempotency-Key: stored results older than this are purged (python -m scripts.purge_idempotency_keys)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
+    # Write-behind of quiz attempts/answers: rows are queued after the XP commit
+    # and written by a background thread in batches. Off by default.
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_QUEUE_SIZE: int = 10000  # попыток; при переполнении пишем сразу, в запросе
+    WRITE_BEHIND_BATCH_SIZE: int = 500
+    WRITE_BEHIND_FLUSH_SECONDS: float = 0.005
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+
+    # Observability
+    METRICS_ENABLED: bool = True  # /metrics в формате Prometheus
+    SLOW_QUERY_SECONDS: float = 0.2  # запросы дольше пишутся в лог с маршрутом
+    READINESS_TIMEOUT_SECONDS: float = 2.0
     
     class Config:
         case_sensitive = True
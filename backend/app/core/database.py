@@ -1,14 +1,47 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .instrumentation import instrument_engine
+from .pool import PoolStats, instrumented_pool_class, pool_options, pool_status
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Create SQLAlchemy engine (sync: scripts, maintenance, non-hot routers)
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=instrumented_pool_class(QueuePool, PoolStats()),
+    **pool_options(),
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for the hot API routers
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, PoolStats()),
+    **pool_options(),
+)
+
+# expire_on_commit=False: after commit attributes stay readable without lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# SQL на запрос, время в БД, лог медленных запросов
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+def database_pool_status() -> dict:
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+
 # Base class for models
 Base = declarative_base()
 
@@ -18,4 +51,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
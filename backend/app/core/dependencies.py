@@ -1,22 +1,21 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
-from .security import decode_access_token
-from ..models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
+from .user_cache import UserSnapshot, decode_token_cached, get_user_snapshot
 
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Get current authenticated user (cached snapshot, not an ORM object)"""
     
     token = credentials.credentials
     
     # Decode token
-    payload = decode_access_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,16 +23,16 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    sub = payload.get("sub")
+    if sub is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Get user from cache or database
+    user = await get_user_snapshot(db, int(sub))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,8 +48,8 @@ def get_current_user(
     
     return user
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def get_current_active_user(
+    current_user: UserSnapshot = Depends(get_current_user)
+) -> UserSnapshot:
     """Get current active user"""
     return current_user
\ No newline at end of file
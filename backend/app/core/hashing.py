@@ -0,0 +1,165 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from .config import settings
+from .metrics import Counter, Histogram
+from .security import get_password_hash, verify_password
+
+# Argon2 считается в отдельном пуле процессов: пачка логинов не должна
+# занимать потоки AnyIO, на которых работают все остальные эндпоинты.
+
+
+class HashingUnavailable(Exception):
+    """Password hashing pool is saturated or did not answer in time"""
+
+
+queue_wait = Histogram()
+hash_time = Histogram()
+rejected = Counter()
+timeouts = Counter()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+def _timed_hash(password: str) -> tuple[str, float, float]:
+    started = time.time()
+    hashed = get_password_hash(password)
+    return hashed, started, time.time() - started
+
+
+def _timed_verify(plain_password: str, hashed_password: str) -> tuple[bool, float, float]:
+    started = time.time()
+    ok = verify_password(plain_password, hashed_password)
+    return ok, started, time.time() - started
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+            broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fn, *args) -> Future:
+    """Queue ``fn`` in the pool, holding a pending slot until the job is done.
+
+    The slot is released by the future itself, not by the caller: a job
+    the caller stopped waiting for still occupies a worker.
+    """
+    if not _slots.acquire(blocking=False):
+        rejected.inc()
+        raise HashingUnavailable("Too many pending password hash requests")
+    try:
+        executor = _get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Воркер умер (OOM killer, kill -9) — такой пул не оживает, поднимаем новый
+            _discard_executor(executor)
+            future = _get_executor().submit(fn, *args)
+    except RuntimeError as exc:
+        # пул уже останавливается (shutdown_hashing): запрос пришёл в последние секунды жизни воркера
+        _slots.release()
+        raise HashingUnavailable("Password hashing is shutting down") from exc
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _observe(submitted: float, started: float, duration: float) -> None:
+    queue_wait.observe(max(0.0, started - submitted))
+    hash_time.observe(duration)
+
+
+def _run(fn, *args):
+    submitted = time.time()
+    future = _submit(fn, *args)
+    try:
+        result, started, duration = future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        future.cancel()
+        timeouts.inc()
+        raise HashingUnavailable("Password hashing timed out")
+    except BrokenProcessPool:
+        # следующий _submit заменит пул
+        raise HashingUnavailable("Password hashing worker died")
+    _observe(submitted, started, duration)
+    return result
+
+
+async def _run_async(fn, *args):
+    submitted = time.time()
+    future = _submit(fn, *args)
+    try:
+        result, started, duration = await asyncio.wait_for(
+            asyncio.wrap_future(future), timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        future.cancel()
+        timeouts.inc()
+        raise HashingUnavailable("Password hashing timed out")
+    except BrokenProcessPool:
+        raise HashingUnavailable("Password hashing worker died")
+    _observe(submitted, started, duration)
+    return result
+
+
+def hash_password(password: str) -> str:
+    """Hash a password in the hashing process pool"""
+    return _run(_timed_hash, password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing process pool"""
+    return _run(_timed_verify, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing process pool without blocking the event loop"""
+    return await _run_async(_timed_hash, password)
+
+
+async def check_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing process pool without blocking the event loop"""
+    return await _run_async(_timed_verify, plain_password, hashed_password)
+
+
+def hashing_stats() -> dict:
+    return {
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+        "rejected": rejected.value,
+        "timeouts": timeouts.value,
+        "queue_wait_seconds": queue_wait.snapshot(),
+        "hash_time_seconds": hash_time.snapshot(),
+    }
+
+
+def shutdown_hashing() -> None:
+    """Wait for running hash jobs and stop the pool; blocks, so call it off the event loop"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
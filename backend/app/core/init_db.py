@@ -1,17 +1,13 @@
-from sqlalchemy import inspect
 from .database import Base, engine
 
 def init_db():
-    """Initialize database tables"""
+    """Create all tables straight from the models.
+
+    Development and throwaway test databases only: the schema of real
+    databases is managed by migrations (python -m scripts.migrate), and
+    the app itself never runs DDL on startup.
+    """
     # Import all models here to register them with Base
-    from ..models import User, Book, Chapter, Quiz, Question, Option, QuizAttempt, Answer
-    
-    # Create all tables
+    from .. import models  # noqa: F401
+
     Base.metadata.create_all(bind=engine)
-    
-    # Check what tables were created
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    print(f"✅ Database initialized. Tables: {tables}")
-    
-    return tables
\ No newline at end of file
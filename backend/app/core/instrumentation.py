@@ -0,0 +1,134 @@
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger("bookquest.sql")
+
+# Число SQL на запрос: N+1 видно по хвосту гистограммы
+SQL_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestStats:
+    """SQL work attributed to the request being served"""
+    scope: dict = field(repr=False)
+    statements: int = 0
+    db_time: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI кладёт найденный маршрут в scope при роутинге, то есть до первого SQL
+        return getattr(self.scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+@dataclass
+class RouteMetrics:
+    latency: Histogram
+    statements: Histogram
+    db_time: Histogram
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+_routes: dict[tuple[str, str, str], RouteMetrics] = {}
+_routes_lock = threading.Lock()
+slow_queries = Counter()
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def route_metrics() -> dict[tuple[str, str, str], RouteMetrics]:
+    """(method, route template, status) -> histograms; a copy safe to iterate"""
+    with _routes_lock:
+        return dict(_routes)
+
+
+def _observe_request(method: str, route: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+    key = (method, route, str(status_code))
+    metrics = _routes.get(key)
+    if metrics is None:
+        with _routes_lock:
+            metrics = _routes.setdefault(key, RouteMetrics(Histogram(), Histogram(SQL_COUNT_BUCKETS), Histogram()))
+    metrics.latency.observe(elapsed)
+    metrics.statements.observe(stats.statements)
+    metrics.db_time.observe(stats.db_time)
+
+
+# Начало запроса хранится по его контексту выполнения, а не стеком на соединении:
+# упавший запрос не оставляет чужую отметку, которая сбила бы все следующие замеры
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", {})[context] = time.perf_counter()
+
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        exception_context.connection.info.get("query_start", {}).pop(exception_context.execution_context, None)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_start", {}).pop(context, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+    if elapsed >= settings.SLOW_QUERY_SECONDS:
+        slow_queries.inc()
+        logger.warning(
+            "slow query %.3fs route=%s: %s",
+            elapsed,
+            stats.route if stats is not None else "-",
+            " ".join(statement.split())[:1000],
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement of a (sync) engine; pass async_engine.sync_engine for asyncpg"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class RequestInstrumentationMiddleware:
+    """Pure ASGI middleware: latency, SQL count and DB time per route template.
+
+    The route template (``/api/v1/books/{book_id}``) keeps label cardinality
+    bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _observe_request(scope["method"], stats.route, status_code, time.perf_counter() - start, stats)
+            _current.reset(token)
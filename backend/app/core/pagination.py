@@ -0,0 +1,35 @@
+import base64
+import json
+from typing import Any, Callable, Sequence
+from fastapi import HTTPException, Response, status
+
+# Keyset-пагинация: курсор — непрозрачный base64 от ключа сортировки последней строки.
+# Тело ответа остаётся списком, курсор следующей страницы уходит в заголовке.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor into its ``size`` integer key values, 400 on anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(v, int) and not isinstance(v, bool) for v in values)
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> None:
+    """Advertise the cursor of the next page when this page came back full"""
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
@@ -0,0 +1,63 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+from .config import settings
+from .metrics import Counter, Histogram
+
+# Ожидание соединения из пула: интересны миллисекунды, а не секунды
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolStats:
+    """Checkout counters of one engine's connection pool"""
+
+    def __init__(self):
+        self.checkouts = Counter()
+        self.timeouts = Counter()
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+
+
+def instrumented_pool_class(base: type, stats: PoolStats) -> type:
+    """Subclass a QueuePool flavour so that every checkout is timed into ``stats``.
+
+    Stats live on the class, so they survive ``Pool.recreate()`` on dispose.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = base._do_get(self)
+        except exc.TimeoutError:
+            stats.timeouts.inc()
+            raise
+        finally:
+            stats.checkout_wait.observe(time.perf_counter() - start)
+        stats.checkouts.inc()
+        return conn
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "stats": stats})
+
+
+def pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(pool: Pool) -> dict:
+    stats: PoolStats = pool.stats
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() отрицателен, пока пул не заполнен до pool_size
+        "overflow_in_use": max(0, pool.overflow()),
+        "checkouts": stats.checkouts.value,
+        "timeouts": stats.timeouts.value,
+        "checkout_wait_seconds": stats.checkout_wait.snapshot(),
+    }
@@ -0,0 +1,103 @@
+from typing import Iterable
+from .database import async_engine, engine
+from .hashing import hashing_stats
+from .instrumentation import route_metrics, slow_queries
+from .pool import pool_status
+from ..services.attempt_writer import attempt_writer_stats
+
+# Метрики процесса: при нескольких воркерах каждый отдаёт свои, суммирует Prometheus
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: list[str] = []
+        self._declared: set[str] = set()
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, kind: str, help_text: str, value: float, **labels) -> None:
+        self._declare(name, kind, help_text)
+        self.lines.append(f"{name}{_labels(labels)} {value}")
+
+    def histogram(self, name: str, help_text: str, snapshot: dict, **labels) -> None:
+        self._declare(name, "histogram", help_text)
+        for bound, count in snapshot["buckets"].items():
+            self.lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        self.lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+        self.lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _pools() -> Iterable[tuple[str, dict]]:
+    yield "sync", pool_status(engine.pool)
+    yield "async", pool_status(async_engine.pool)
+
+
+def render_metrics() -> str:
+    """All metrics of this process in Prometheus text exposition format 0.0.4"""
+    out = _Exposition()
+
+    for (method, route, status), metrics in sorted(route_metrics().items()):
+        labels = {"method": method, "route": route, "status": status}
+        out.histogram(
+            "bookquest_http_request_duration_seconds", "HTTP request latency by route template",
+            metrics.latency.snapshot(), **labels,
+        )
+        out.histogram(
+            "bookquest_http_request_sql_statements", "SQL statements executed per HTTP request",
+            metrics.statements.snapshot(), **labels,
+        )
+        out.histogram(
+            "bookquest_http_request_db_seconds", "Time spent in SQL per HTTP request",
+            metrics.db_time.snapshot(), **labels,
+        )
+
+    out.sample(
+        "bookquest_db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_SECONDS",
+        slow_queries.value,
+    )
+
+    for name, status in _pools():
+        out.sample("bookquest_db_pool_size", "gauge", "Configured pool size", status["size"], engine=name)
+        out.sample("bookquest_db_pool_checked_out", "gauge", "Connections in use", status["checked_out"], engine=name)
+        out.sample("bookquest_db_pool_overflow_in_use", "gauge", "Overflow connections in use", status["overflow_in_use"], engine=name)
+        out.sample("bookquest_db_pool_checkouts_total", "counter", "Connection checkouts", status["checkouts"], engine=name)
+        out.sample("bookquest_db_pool_timeouts_total", "counter", "Checkouts that hit DB_POOL_TIMEOUT", status["timeouts"], engine=name)
+        out.histogram(
+            "bookquest_db_pool_checkout_wait_seconds", "Time waiting for a pooled connection",
+            status["checkout_wait_seconds"], engine=name,
+        )
+
+    hashing = hashing_stats()
+    out.sample("bookquest_password_hash_rejected_total", "counter", "Hash requests rejected as saturated", hashing["rejected"])
+    out.sample("bookquest_password_hash_timeouts_total", "counter", "Hash requests that timed out", hashing["timeouts"])
+    out.histogram("bookquest_password_hash_queue_wait_seconds", "Wait for a hashing worker", hashing["queue_wait_seconds"])
+    out.histogram("bookquest_password_hash_duration_seconds", "Argon2 hash/verify time", hashing["hash_time_seconds"])
+
+    writer = attempt_writer_stats()
+    if writer["enabled"]:
+        out.sample("bookquest_write_behind_queued", "gauge", "Attempts waiting in the write-behind queue", writer["queued"])
+        out.sample("bookquest_write_behind_capacity", "gauge", "WRITE_BEHIND_QUEUE_SIZE", writer["capacity"])
+        out.sample("bookquest_write_behind_flushed_total", "counter", "Attempts written by the background writer", writer["flushed"])
+        out.sample("bookquest_write_behind_overflows_total", "counter", "Attempts written inline because the queue was full", writer["overflows"])
+        out.sample("bookquest_write_behind_dropped_total", "counter", "Attempts that failed to write and were dropped", writer["dropped"])
+        out.histogram("bookquest_write_behind_batch_size", "Attempts per background flush", writer["batch_size"])
+        out.histogram("bookquest_write_behind_flush_seconds", "Time to write one batch", writer["flush_seconds"])
+
+    return out.render()
@@ -0,0 +1,26 @@
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# Z вместо +00:00 — так же, как сериализует pydantic
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def schema_columns(model, schema: type[BaseModel], exclude: tuple[str, ...] = ()) -> tuple:
+    """Table columns of `model` for every field of `schema`, in field order.
+
+    Selecting exactly these gives rows that serialize to the same JSON as
+    the schema would, without hydrating ORM entities. Nested collections
+    go to `exclude` and are filled by the caller.
+    """
+    return tuple(model.__table__.c[name] for name in schema.model_fields if name not in exclude)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """Already-shaped data serialized with orjson, bypassing response_model validation"""
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json", headers=headers)
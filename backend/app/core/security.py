@@ -5,7 +5,16 @@ from passlib.context import CryptContext
 from .config import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+_argon2_params = {
+    f"argon2__{name}": value
+    for name, value in (
+        ("time_cost", settings.ARGON2_TIME_COST),
+        ("memory_cost", settings.ARGON2_MEMORY_COST),
+        ("parallelism", settings.ARGON2_PARALLELISM),
+    )
+    if value is not None
+}
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **_argon2_params)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -0,0 +1,84 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
+from .config import settings
+from .security import decode_access_token
+from ..models import User
+
+# Кэш живёт в процессе воркера: между воркерами изменения расходятся не дольше TTL
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only view of an authenticated user"""
+    id: int
+    email: str
+    username: str
+    level: int
+    current_xp: int
+    total_xp: int
+    reading_streak: int
+    created_at: datetime
+    last_reading_date: Optional[datetime]
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            level=user.level,
+            current_xp=user.current_xp,
+            total_xp=user.total_xp,
+            reading_streak=user.reading_streak,
+            created_at=user.created_at,
+            last_reading_date=user.last_reading_date,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+        )
+
+
+_tokens = TTLCache(settings.AUTH_CACHE_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
+_users = TTLCache(settings.AUTH_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """Decode a JWT, reusing the result until the cache TTL or the token expiry"""
+    payload = _tokens.get(token)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    _tokens.set(token, payload, ttl=ttl)
+    return payload
+
+
+async def get_user_snapshot(db: AsyncSession, user_id: int) -> Optional[UserSnapshot]:
+    """Return a cached snapshot of the user, querying the database on miss"""
+    snapshot = _users.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    generation = _users.generation
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_user(user)
+    _users.set(user_id, snapshot, generation=generation)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached snapshot after the user row was changed"""
+    _users.pop(user_id)
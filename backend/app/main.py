@@ -1,12 +1,26 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from .core.config import settings
-from .core.init_db import init_db
+from .core.database import async_engine
+from .core.instrumentation import RequestInstrumentationMiddleware
+from .core.prometheus import render_metrics
+from .core.hashing import HashingUnavailable, shutdown_hashing
+from .core.pagination import NEXT_CURSOR_HEADER
+from .services.attempt_writer import shutdown_attempt_writer
+from .services.idempotency import REPLAY_HEADER
 from .api import auth
 from .api import books as books_router
 from .api import chapters as chapters_router
 from .api import users as users_router
 from .api import quizzes as quizzes_router
+from .api import internal as internal_router
+from .api import leaderboard as leaderboard_router
+from .api import search as search_router
+from .api import progress as progress_router
+from .api import attempts as attempts_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -15,10 +29,22 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    init_db()
+# No DDL or reflection on startup: the schema is migrated once per deploy
+# (python -m scripts.migrate), so N workers boot without touching the catalog.
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # ждём текущие argon2-задачи и дописываем очередь write-behind, не блокируя event loop
+    await asyncio.to_thread(shutdown_hashing)
+    await asyncio.to_thread(shutdown_attempt_writer)
+
+@app.exception_handler(HashingUnavailable)
+async def hashing_unavailable_handler(request: Request, exc: HashingUnavailable):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
 
 # CORS middleware
 app.add_middleware(
@@ -27,8 +53,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REPLAY_HEADER, "ETag"],
 )
 
+# Outermost: times the whole request, CORS included
+app.add_middleware(RequestInstrumentationMiddleware)
+
 @app.get("/")
 async def root():
     return {
@@ -39,11 +69,41 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    """Liveness: the process is up and serving"""
     return {"status": "healthy"}
 
+
+async def _ping_database() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: a pooled connection can be checked out and answers a query"""
+    try:
+        await asyncio.wait_for(_ping_database(), timeout=settings.READINESS_TIMEOUT_SECONDS)
+    except Exception as exc:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "database": type(exc).__name__},
+        )
+    return {"status": "ready", "database": "ok"}
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Authentication"])
 app.include_router(books_router.router, prefix=f"{settings.API_V1_STR}/books", tags=["Books"])
 app.include_router(chapters_router.router, prefix=f"{settings.API_V1_STR}/chapters", tags=["Chapters"])
 app.include_router(users_router.router, prefix=f"{settings.API_V1_STR}/users", tags=["Users"])
-app.include_router(quizzes_router.router, prefix=f"{settings.API_V1_STR}/quizzes", tags=["Quizzes"])
\ No newline at end of file
+app.include_router(quizzes_router.router, prefix=f"{settings.API_V1_STR}/quizzes", tags=["Quizzes"])
+app.include_router(progress_router.router, prefix=f"{settings.API_V1_STR}/progress", tags=["Reading Progress"])
+app.include_router(attempts_router.router, prefix=f"{settings.API_V1_STR}/attempts", tags=["Quiz Attempts"])
+app.include_router(search_router.router, prefix=f"{settings.API_V1_STR}/search", tags=["Search"])
+app.include_router(leaderboard_router.router, prefix=f"{settings.API_V1_STR}/leaderboard", tags=["Leaderboard"])
+app.include_router(internal_router.router, prefix=f"{settings.API_V1_STR}/internal", tags=["Internal"])
\ No newline at end of file
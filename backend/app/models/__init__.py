@@ -2,6 +2,11 @@ from .user import User
 from .book import Book, DifficultyLevel
 from .chapter import Chapter
 from .quiz import Quiz, Question, Option, QuizAttempt, Answer, QuestionType
+from .reading_progress import ReadingProgress
+from .item_stats import QuestionStat, OptionStat
+from .idempotency import IdempotencyKey
+from . import search  # noqa: F401  (DDL для полнотекстового поиска)
+from . import partitions  # noqa: F401  (начальные секции попыток при create_all)
 
 __all__ = [
     "User",
@@ -15,5 +20,7 @@ __all__ = [
     "Answer",
     "QuestionType",
     "ReadingProgress",
-    "ReadingProgressStatus"
+    "QuestionStat",
+    "OptionStat",
+    "IdempotencyKey",
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, Text, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from ..core.database import Base
 
 class Chapter(Base):
@@ -11,10 +12,22 @@ class Chapter(Base):
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     estimated_reading_time = Column(Integer)  # в минутах
+    # Для /content (Content-Length, Range, ETag): считает Postgres при записи, а не на каждый запрос
+    content_bytes = Column(Integer, Computed("octet_length(content)", persisted=True))
+    content_md5 = Column(String(32), Computed("md5(content)", persisted=True))
+
+    # Full-text search: заполняется триггером в БД (см. models/search.py)
+    search_vector = deferred(Column(TSVECTOR))
     
     # Relationships
     book = relationship("Book", back_populates="chapters")
     quiz = relationship("Quiz", back_populates="chapter", uselist=False)
 
+    __table_args__ = (
+        # порядок оглавления и keyset-пагинация list_chapters
+        Index("ix_chapters_book_id_chapter_number_id", "book_id", "chapter_number", "id"),
+        Index("ix_chapters_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Chapter {self.chapter_number}: {self.title}>" 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class IdempotencyKey(Base):
+    """Result of a request made with an Idempotency-Key, replayed to retries.
+
+    The row is inserted at the start of the request's transaction and gets
+    its response in the same transaction, so a committed row always has one.
+    A concurrent duplicate blocks on the uncommitted key until then.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 метода, пути и тела запроса
+    status_code = Column(Integer)
+    response = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class QuestionStat(Base):
+    """Running counters of one question, updated by every submission.
+
+    Besides attempts/correct it keeps sums of the attempt score fraction
+    (correct / total of the whole attempt), which is enough to derive the
+    point-biserial discrimination index without re-reading answers.
+    """
+    __tablename__ = "question_stats"
+
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)
+    score_sum_correct = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class OptionStat(Base):
+    """How often an option was selected (single/multi choice questions)"""
+    __tablename__ = "option_stats"
+
+    option_id = Column(Integer, ForeignKey("options.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    picks = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_option_stats_question_id", "question_id"),
+    )
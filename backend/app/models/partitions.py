@@ -0,0 +1,111 @@
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import event, text
+from ..core.config import settings
+from .quiz import Answer
+
+# Секционируются по месяцу попытки. Порядок важен: answers ссылается на quiz_attempts,
+# поэтому удаляем сначала answers, а создаём в любом порядке.
+PARTITIONED_TABLES = ("answers", "quiz_attempts")
+
+_MONTH_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partition_name(name: str) -> bool:
+    """Whether ``name`` is a monthly or default partition of one of PARTITIONED_TABLES"""
+    for table in PARTITIONED_TABLES:
+        if name == f"{table}_default":
+            return True
+        if name.startswith(table) and _MONTH_SUFFIX.fullmatch(name[len(table):]):
+            return True
+    return False
+
+
+def _bound(month: date) -> str:
+    # границы в UTC, чтобы не зависеть от TimeZone сессии
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def ensure_partitions(connection, first: date, last: date) -> list[str]:
+    """Create the monthly partitions covering [first, last] plus the default ones.
+
+    Idempotent. Returns the names of partitions that did not exist before.
+    Works with both a Connection and a Session (anything with ``execute``).
+    """
+    existing = set(list_partitions(connection))
+    created = []
+    month, last = month_start(first), month_start(last)
+    while month <= last:
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, month)
+            if name not in existing:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+                ))
+                created.append(name)
+        month = add_months(month, 1)
+    # Страховка: строки вне созданных месяцев не роняют вставку.
+    # Пока DEFAULT пуст, новые месяцы создаются без переноса данных.
+    for table in PARTITIONED_TABLES:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+    return created
+
+
+def list_partitions(connection, table: Optional[str] = None) -> list[str]:
+    """Names of the monthly partitions of one or all partitioned tables"""
+    rows = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = ANY(:tables) ORDER BY c.relname"
+    ), {"tables": [table] if table else list(PARTITIONED_TABLES)})
+    return [name for (name,) in rows if _MONTH_SUFFIX.search(name)]
+
+
+def drop_partitions_before(connection, month: date) -> list[str]:
+    """Drop whole months older than `month` (answers first); returns dropped names.
+
+    Partitions are detached before the drop: a partition of quiz_attempts
+    is referenced by the answers foreign key, and DETACH checks that no
+    answers point at it any more.
+    """
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name in list_partitions(connection, table):
+            year, mon = _MONTH_SUFFIX.search(name).groups()
+            if date(int(year), int(mon), 1) < month_start(month):
+                connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                connection.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    return dropped
+
+
+def default_partition_rows(connection) -> int:
+    """Rows that landed outside every monthly partition; should stay 0"""
+    return sum(
+        connection.execute(text(f"SELECT count(*) FROM {table}_default")).scalar_one()
+        for table in PARTITIONED_TABLES
+    )
+
+
+def _create_initial_partitions(target, connection, **kw) -> None:
+    today = datetime.now(timezone.utc).date()
+    ensure_partitions(connection, today, add_months(month_start(today), settings.ATTEMPT_PARTITIONS_AHEAD))
+
+
+# Только для create_all в dev-окружении; answers создаётся после quiz_attempts
+event.listen(Answer.__table__, "after_create", _create_initial_partitions)
@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import (
+    Column, Integer, String, Text, ForeignKey, ForeignKeyConstraint, Boolean, DateTime, Enum as SQLEnum,
+    Index, UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -28,7 +31,12 @@ class Quiz(Base):
 
     # relationships
     chapter = relationship("Chapter", back_populates="quiz")
-    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
+    questions = relationship(
+        "Question",
+        back_populates="quiz",
+        cascade="all, delete-orphan",
+        order_by=lambda: [Question.order_index, Question.id],
+    )
 
 
 class Question(Base):
@@ -42,7 +50,12 @@ class Question(Base):
     score = Column(Integer, default=1)
 
     quiz = relationship("Quiz", back_populates="questions")
-    options = relationship("Option", back_populates="question", cascade="all, delete-orphan")
+    options = relationship(
+        "Option",
+        back_populates="question",
+        cascade="all, delete-orphan",
+        order_by=lambda: [Option.order_index, Option.id],
+    )
 
 
 class Option(Base):
@@ -64,12 +77,18 @@ class Option(Base):
 
 
 class QuizAttempt(Base):
+    """One submitted quiz.
+
+    Partitioned by month of started_at (see models/partitions.py): the
+    partition key has to be part of the primary key, and answers reference
+    attempts by (id, started_at).
+    """
     __tablename__ = "quiz_attempts"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     finished_at = Column(DateTime(timezone=True))
     is_perfect = Column(Boolean, default=False)
     score_earned = Column(Integer, default=0)
@@ -80,12 +99,22 @@ class QuizAttempt(Base):
     answers = relationship("Answer", back_populates="attempt", cascade="all, delete-orphan")
     quiz = relationship("Quiz")
 
+    __table_args__ = (
+        # история пользователя, история по тесту у пользователя, все попытки теста
+        Index("ix_quiz_attempts_user_id_started_at", "user_id", "started_at"),
+        Index("ix_quiz_attempts_user_id_quiz_id_started_at", "user_id", "quiz_id", "started_at"),
+        Index("ix_quiz_attempts_quiz_id_started_at", "quiz_id", "started_at"),
+        {"postgresql_partition_by": "RANGE (started_at)"},
+    )
+
 
 class Answer(Base):
     __tablename__ = "answers"
 
-    id = Column(Integer, primary_key=True, index=True)
-    attempt_id = Column(Integer, ForeignKey("quiz_attempts.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    attempt_id = Column(Integer, nullable=False, index=True)
+    # копия started_at попытки: ключ секционирования и часть внешнего ключа
+    attempt_started_at = Column(DateTime(timezone=True), primary_key=True)
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
     # хранение ответа в формате JSON, в зависимости от типа вопроса
     selected_option_ids = Column(JSONB, nullable=True)  # list[int]
@@ -94,3 +123,13 @@ class Answer(Base):
 
     attempt = relationship("QuizAttempt", back_populates="answers")
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["attempt_id", "attempt_started_at"],
+            ["quiz_attempts.id", "quiz_attempts.started_at"],
+            ondelete="CASCADE",
+        ),
+        # проверка "на вопрос уже отвечали" и FK questions при удалении вопроса
+        Index("ix_answers_question_id", "question_id"),
+        {"postgresql_partition_by": "RANGE (attempt_started_at)"},
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -26,6 +26,8 @@ class ReadingProgress(Base):
     
     __table_args__ = (
         UniqueConstraint("user_id", "book_id", name="uq_user_book_progress"),
+        # "Моя библиотека": прогресс пользователя по дате последнего чтения
+        Index("ix_reading_progress_user_id_last_read_at", "user_id", "last_read_at"),
     )
     
     def __repr__(self):
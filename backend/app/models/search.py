@@ -0,0 +1,79 @@
+from sqlalchemy import DDL, event
+from ..core.database import Base
+from .book import Book
+from .chapter import Chapter
+
+# Конфигурация text search выбирается по Book.language. Для казахского в Postgres
+# нет словаря, поэтому kk (и всё неизвестное) индексируется как 'simple'.
+TS_CONFIGS = {"ru": "russian", "en": "english"}
+DEFAULT_TS_CONFIG = "simple"
+
+# tsvector ограничен 1 МБ: индексируем только начало очень длинных глав
+MAX_INDEXED_CHAPTER_CHARS = 500_000
+
+TS_CONFIG_FUNCTION = DDL(f"""
+CREATE OR REPLACE FUNCTION bookquest_ts_config(lang text) RETURNS regconfig
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE lang
+        {" ".join(f"WHEN '{lang}' THEN '{cfg}'::regconfig" for lang, cfg in TS_CONFIGS.items())}
+        ELSE '{DEFAULT_TS_CONFIG}'::regconfig
+    END
+$$
+""")
+
+BOOKS_SEARCH_TRIGGER = DDL("""
+CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.author, '')), 'B') ||
+        setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER books_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, author, description, language ON books
+    FOR EACH ROW EXECUTE FUNCTION books_search_vector_update();
+
+-- смена языка книги переиндексирует её главы
+CREATE OR REPLACE FUNCTION books_language_reindex_chapters() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE chapters SET title = title WHERE book_id = NEW.id;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER books_language_reindex_trg
+    AFTER UPDATE OF language ON books
+    FOR EACH ROW WHEN (OLD.language IS DISTINCT FROM NEW.language)
+    EXECUTE FUNCTION books_language_reindex_chapters();
+""")
+
+CHAPTERS_SEARCH_TRIGGER = DDL(f"""
+CREATE OR REPLACE FUNCTION chapters_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    cfg regconfig;
+BEGIN
+    SELECT bookquest_ts_config(language) INTO cfg FROM books WHERE id = NEW.book_id;
+    cfg := coalesce(cfg, '{DEFAULT_TS_CONFIG}'::regconfig);
+    NEW.search_vector :=
+        setweight(to_tsvector(cfg, coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector(cfg, left(NEW.content, {MAX_INDEXED_CHAPTER_CHARS})), 'D');
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER chapters_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, content, book_id ON chapters
+    FOR EACH ROW EXECUTE FUNCTION chapters_search_vector_update();
+""")
+
+# Только для create_all в dev-окружении
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+event.listen(Base.metadata, "before_create", TS_CONFIG_FUNCTION)
+event.listen(Book.__table__, "after_create", BOOKS_SEARCH_TRIGGER)
+event.listen(Chapter.__table__, "after_create", CHAPTERS_SEARCH_TRIGGER)
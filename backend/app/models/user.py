@@ -13,7 +13,7 @@ class User(Base):
     # Profile info
     level = Column(Integer, default=1)
     current_xp = Column(Integer, default=0)
-    total_xp = Column(Integer, default=0)
+    total_xp = Column(Integer, default=0, index=True)  # лидерборд
     reading_streak = Column(Integer, default=0)
     
     # Timestamps
@@ -5,7 +5,9 @@ from .user import (
     UserStats,
     UserUpdate,
     Token,
-    TokenData
+    TokenData,
+    XPGrantBatch,
+    XPGrantBatchResult,
 )
 from .book import (
     BookCreate,
@@ -17,11 +19,14 @@ from .chapter import (
     ChapterCreate,
     ChapterUpdate,
     Chapter,
+    ChapterSummary,
 )
 from .quiz import (
     QuizCreate,
     QuizUpdate,
     Quiz,
+    QuizPublic,
+    QuizTree,
     QuestionCreate,
     QuestionUpdate,
     Question,
@@ -31,6 +36,21 @@ from .quiz import (
     QuizSubmission,
     QuizResult,
     QuestionResult,
+    QuizStats,
+)
+
+from .attempt import AttemptSummary
+
+from .leaderboard import (
+    LeaderboardEntry,
+    LeaderboardRank,
+)
+
+from .search import (
+    BookHit,
+    ChapterHit,
+    SearchResults,
+    Suggestion,
 )
 
 from .reading_progress import (
@@ -48,15 +68,20 @@ __all__ = [
     "UserUpdate",
     "Token",
     "TokenData",
+    "XPGrantBatch",
+    "XPGrantBatchResult",
     "BookCreate",
     "BookUpdate",
     "Book",
     "ChapterCreate",
     "ChapterUpdate",
     "Chapter",
+    "ChapterSummary",
     "QuizCreate",
     "QuizUpdate",
     "Quiz",
+    "QuizPublic",
+    "QuizTree",
     "QuestionCreate",
     "QuestionUpdate",
     "Question",
@@ -66,8 +91,16 @@ __all__ = [
     "QuizSubmission",
     "QuizResult",
     "QuestionResult",
+    "QuizStats",
+    "AttemptSummary",
     "ReadingProgressCreate",
     "ReadingProgressUpdate",
     "ReadingProgress",
-    "ReadingProgressWithBook"
+    "ReadingProgressWithBook",
+    "LeaderboardEntry",
+    "LeaderboardRank",
+    "BookHit",
+    "ChapterHit",
+    "SearchResults",
+    "Suggestion",
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class AttemptSummary(BaseModel):
+    id: int
+    user_id: int
+    quiz_id: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    is_perfect: bool = False
+    score_earned: int = 0
+    total_questions: int = 0
+    correct_questions: int = 0
+
+    class Config:
+        from_attributes = True
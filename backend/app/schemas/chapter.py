@@ -28,3 +28,13 @@ class Chapter(ChapterBase):
         from_attributes = True
 
 
+class ChapterSummary(BaseModel):
+    """Chapter without its content, for tables of contents"""
+    id: int
+    book_id: int
+    chapter_number: int
+    title: str
+    estimated_reading_time: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    level: int
+    total_xp: int
+
+
+class LeaderboardRank(BaseModel):
+    user_id: int
+    rank: int
+    total_xp: int
+    total_users: int
@@ -81,6 +81,54 @@ class Quiz(QuizBase):
         from_attributes = True
 
 
+# Whole-tree authoring: an id updates that row in place, no id inserts a new one,
+# rows missing from the document are deleted
+
+class OptionTree(OptionBase):
+    id: Optional[int] = None
+
+
+class QuestionTree(QuestionBase):
+    id: Optional[int] = None
+    options: List[OptionTree] = []
+
+
+class QuizTree(BaseModel):
+    title: str
+    description: Optional[str] = None
+    is_active: bool = True
+    quiz_xp: Optional[int] = None
+    questions: List[QuestionTree] = []
+
+
+# Public (student-facing) models: no is_correct
+
+class OptionPublic(BaseModel):
+    id: int
+    text: str
+    order_index: Optional[int] = None
+    match_key: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class QuestionPublic(QuestionBase):
+    id: int
+    options: List[OptionPublic] = []
+
+    class Config:
+        from_attributes = True
+
+
+class QuizPublic(QuizBase):
+    id: int
+    questions: List[QuestionPublic] = []
+
+    class Config:
+        from_attributes = True
+
+
 # Submission models
 
 class SingleMultiAnswer(BaseModel):
@@ -120,3 +168,30 @@ class QuizResult(BaseModel):
     question_results: List[QuestionResult]
 
 
+
+
+# Item statistics (admin)
+
+class OptionStats(BaseModel):
+    option_id: int
+    text: str
+    is_correct: Optional[bool] = None
+    picks: int
+    pick_rate: Optional[float] = None  # доля попыток вопроса, выбравших вариант
+
+
+class QuestionStats(BaseModel):
+    question_id: int
+    type: QuestionType
+    text: str
+    order_index: int = 0
+    attempts: int
+    correct: int
+    difficulty: Optional[float] = None  # доля верных ответов (p-value): меньше — труднее
+    discrimination: Optional[float] = None  # точечно-бисериальная корреляция с баллом попытки
+    options: List[OptionStats] = []
+
+
+class QuizStats(BaseModel):
+    quiz_id: int
+    questions: List[QuestionStats]
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class BookHit(BaseModel):
+    id: int
+    title: str
+    author: str
+    cover_image_url: Optional[str] = None
+    language: Optional[str] = None
+    rank: float
+
+    class Config:
+        from_attributes = True
+
+
+class ChapterHit(BaseModel):
+    id: int
+    book_id: int
+    chapter_number: int
+    title: str
+    book_title: str
+    rank: float
+    snippet: str  # фрагменты с <b>подсветкой</b>
+
+    class Config:
+        from_attributes = True
+
+
+class SearchResults(BaseModel):
+    books: List[BookHit]
+    chapters: List[ChapterHit]
+
+
+class Suggestion(BaseModel):
+    id: int
+    title: str
+    author: str
+
+    class Config:
+        from_attributes = True
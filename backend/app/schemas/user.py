@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # Base schema
@@ -58,4 +58,23 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 class TokenData(BaseModel):
-    user_id: Optional[int] = None
\ No newline at end of file
+    user_id: Optional[int] = None
+
+# Batch XP grants (events, teacher bonuses, regrades)
+class XPGrant(BaseModel):
+    user_id: int
+    xp: int = Field(..., gt=0)
+
+class XPGrantBatch(BaseModel):
+    grants: List[XPGrant] = Field(..., min_length=1)
+    reason: Optional[str] = None
+
+class XPGrantResult(BaseModel):
+    user_id: int
+    level: int
+    current_xp: int
+    total_xp: int
+
+class XPGrantBatchResult(BaseModel):
+    updated: List[XPGrantResult]
+    missing_user_ids: List[int] = []
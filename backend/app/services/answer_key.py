@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Mapping
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models import Question
+from .grading import QuestionKey, compile_question
+
+
+@dataclass(frozen=True)
+class QuizKey:
+    """Compiled answer key of a whole quiz, keyed by question id"""
+    quiz_id: int
+    questions: Mapping[int, QuestionKey]
+    total_score: int
+
+
+_answer_keys = TTLCache(settings.ANSWER_KEY_CACHE_SIZE, settings.ANSWER_KEY_CACHE_TTL_SECONDS)
+
+
+def compile_quiz(quiz_id: int, questions: list[Question]) -> QuizKey:
+    compiled = {q.id: compile_question(q) for q in questions}
+    return QuizKey(
+        quiz_id=quiz_id,
+        questions=compiled,
+        total_score=sum(q.score for q in compiled.values()),
+    )
+
+
+async def get_answer_key(db: AsyncSession, quiz_id: int) -> QuizKey:
+    """Return the compiled answer key of a quiz, loading it on cache miss"""
+    key = _answer_keys.get(quiz_id)
+    if key is not None:
+        return key
+
+    generation = _answer_keys.generation
+    questions = (await db.scalars(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.quiz_id == quiz_id)
+    )).all()
+    key = compile_quiz(quiz_id, questions)
+    _answer_keys.set(quiz_id, key, generation=generation)
+    return key
+
+
+def invalidate_answer_key(quiz_id: int) -> None:
+    """Drop the cached answer key after the quiz tree was edited.
+
+    Only this process's cache is cleared; other workers pick up the edit
+    when their entry expires (ANSWER_KEY_CACHE_TTL_SECONDS).
+    """
+    _answer_keys.pop(quiz_id)
@@ -0,0 +1,213 @@
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+import psycopg2
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.bulk import copy_rows
+from ..core.config import settings
+from ..core.database import engine
+from ..core.metrics import Counter, Histogram
+from ..models import Answer, QuizAttempt
+
+# Write-behind попыток: ответ клиенту уходит после коммита XP, а попытка
+# с ответами пишется фоновым потоком пачками через синхронный движок.
+
+logger = logging.getLogger("bookquest.write_behind")
+
+ATTEMPT_COLUMNS = (
+    "id", "user_id", "quiz_id", "started_at", "is_perfect",
+    "score_earned", "total_questions", "correct_questions",
+)
+ANSWER_COLUMNS = ("attempt_id", "attempt_started_at", "question_id", "selected_option_ids", "ordering", "matches")
+_JSON_FIELDS = ("selected_option_ids", "ordering", "matches")
+_WRITE_RETRIES = 3
+# COPY идёт мимо SQLAlchemy (copy_expert), поэтому ловим и исключения psycopg2
+_CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+_WRITE_ERRORS = (SQLAlchemyError, psycopg2.Error)
+
+batch_size = Histogram(buckets=(1, 10, 50, 100, 250, 500, 1000, 2500))
+flush_time = Histogram()
+flushed = Counter()
+overflows = Counter()
+dropped = Counter()
+
+
+@dataclass(frozen=True)
+class PendingAttempt:
+    """Attempt row (with started_at already set) and its answer rows"""
+    attempt: dict
+    answers: list[dict]
+
+
+_queue: "queue.Queue[PendingAttempt]" = queue.Queue(maxsize=settings.WRITE_BEHIND_QUEUE_SIZE)
+_stopping = threading.Event()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+
+
+async def save_attempt(db: AsyncSession, attempt: dict, answers: list[dict]) -> int:
+    """Insert an attempt and its answers in the caller's transaction; returns the attempt id"""
+    attempt_id = (await db.execute(insert(QuizAttempt).values(**attempt).returning(QuizAttempt.id))).scalar_one()
+    if answers:
+        await db.execute(insert(Answer), [
+            {**row, "attempt_id": attempt_id, "attempt_started_at": attempt["started_at"]} for row in answers
+        ])
+    return attempt_id
+
+
+def enqueue_attempt(attempt: dict, answers: list[dict]) -> bool:
+    """Hand an attempt to the background writer.
+
+    False means the caller has to write it itself: the queue is full
+    (backpressure — the request pays for its own insert, memory stays
+    bounded) or the writer is shutting down.
+    """
+    if _stopping.is_set():
+        return False
+    _ensure_started()
+    try:
+        _queue.put_nowait(PendingAttempt(attempt, answers))
+    except queue.Full:
+        overflows.inc()
+        return False
+    return True
+
+
+def _ensure_started() -> None:
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        with _thread_lock:
+            if _thread is None or not _thread.is_alive():
+                _thread = threading.Thread(target=_run, name="attempt-writer", daemon=True)
+                _thread.start()
+
+
+def _next_batch() -> list[PendingAttempt]:
+    """Block for the first item, then collect more for up to WRITE_BEHIND_FLUSH_SECONDS"""
+    try:
+        batch = [_queue.get(timeout=settings.WRITE_BEHIND_FLUSH_SECONDS * 20)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + settings.WRITE_BEHIND_FLUSH_SECONDS
+    while len(batch) < settings.WRITE_BEHIND_BATCH_SIZE:
+        timeout = deadline - time.monotonic()
+        try:
+            batch.append(_queue.get(timeout=timeout) if timeout > 0 else _queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run() -> None:
+    while True:
+        batch = _next_batch()
+        if not batch:
+            if _stopping.is_set():
+                return
+            continue
+        try:
+            _flush(batch)
+        except Exception:
+            # поток не должен умереть: иначе очередь копится и никогда не пишется
+            dropped.inc(len(batch))
+            logger.exception("Attempt writer failed to flush %d attempts", len(batch))
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _write(batch: list[PendingAttempt]) -> None:
+    # id заранее из последовательности, затем COPY попыток и ответов — три обращения на пачку
+    with engine.begin() as connection:
+        ids = connection.execute(
+            select(func.nextval("quiz_attempts_id_seq")).select_from(func.generate_series(1, len(batch)))
+        ).scalars().all()
+        copy_rows(connection, QuizAttempt.__tablename__, ATTEMPT_COLUMNS, (
+            (attempt_id, *(item.attempt.get(c) for c in ATTEMPT_COLUMNS[1:]))
+            for attempt_id, item in zip(ids, batch)
+        ))
+        copy_rows(connection, Answer.__tablename__, ANSWER_COLUMNS, (
+            (
+                attempt_id, item.attempt["started_at"], row["question_id"],
+                *(None if row.get(f) is None else json.dumps(row[f]) for f in _JSON_FIELDS),
+            )
+            for attempt_id, item in zip(ids, batch)
+            for row in item.answers
+        ))
+
+
+def _flush(batch: list[PendingAttempt]) -> None:
+    started = time.perf_counter()
+    for retry in range(_WRITE_RETRIES):
+        try:
+            _write(batch)
+        except DBAPIError as exc:
+            if not exc.connection_invalidated:
+                break  # ошибка в данных, а не в соединении: повтор не поможет
+            time.sleep(0.1 * 2 ** retry)
+        except _CONNECTION_ERRORS:
+            time.sleep(0.1 * 2 ** retry)
+        except _WRITE_ERRORS:
+            break
+        else:
+            flushed.inc(len(batch))
+            batch_size.observe(len(batch))
+            flush_time.observe(time.perf_counter() - started)
+            return
+
+    # По одной, чтобы одна плохая строка не потянула за собой всю пачку
+    for item in batch:
+        try:
+            _write([item])
+            flushed.inc()
+        except _WRITE_ERRORS:
+            dropped.inc()
+            logger.exception(
+                "Dropping quiz attempt of user %s at quiz %s",
+                item.attempt.get("user_id"), item.attempt.get("quiz_id"),
+            )
+
+
+def attempt_writer_stats() -> dict:
+    return {
+        "enabled": settings.WRITE_BEHIND_ENABLED,
+        "queued": _queue.qsize(),
+        "capacity": settings.WRITE_BEHIND_QUEUE_SIZE,
+        "flushed": flushed.value,
+        "overflows": overflows.value,
+        "dropped": dropped.value,
+        "batch_size": batch_size.snapshot(),
+        "flush_seconds": flush_time.snapshot(),
+    }
+
+
+def shutdown_attempt_writer() -> None:
+    """Stop accepting attempts and wait until everything queued is written"""
+    _stopping.set()
+    if _thread is None:
+        return
+    _thread.join(timeout=settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS)
+    if _thread.is_alive():
+        logger.error("Attempt writer did not drain in time, %d attempts not written", _queue.qsize())
+        return
+    # то, что успели положить, пока поток уже завершался
+    while True:
+        batch = []
+        while len(batch) < settings.WRITE_BEHIND_BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            _flush(batch)
+        except Exception:
+            dropped.inc(len(batch))
+            logger.exception("Attempt writer failed to flush %d attempts on shutdown", len(batch))
@@ -0,0 +1,340 @@
+import io
+import math
+import posixpath
+import re
+import zipfile
+import zlib
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import BinaryIO, Iterable, Iterator, Optional
+from xml.etree import ElementTree
+
+import psycopg2
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..core.bulk import copy_rows
+from ..models import Book
+
+WORDS_PER_MINUTE = 200
+# Глава без заголовков длиннее этого режется по границе абзаца: память ограничена
+MAX_CHAPTER_CHARS = 1_000_000
+SUPPORTED_FORMATS = ("txt", "md", "epub")
+
+# "Глава 1", "CHAPTER IV", "Тарау 3", "Часть вторая", "Part One: The Road"…
+# После ключевого слова обязателен номер: арабский, римский (только заглавными) или порядковое
+# слово. Иначе главой становится любая фраза вроде "Part of the problem was…" или "Глава семьи…"
+_ORDINAL_WORDS = (
+    r"(?:перв|втор|трет|четв[её]рт|пят|шест|седьм|восьм|девят|десят)\w*"
+    r"|(?:бірінші|екінші|үшінші|төртінші|бесінші|алтыншы|жетінші|сегізінші|тоғызыншы|оныншы)"
+    r"|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve"
+    r"|first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth"
+)
+_TEXT_HEADING_RE = re.compile(
+    r"^\s*(?:глава|часть|тарау|бөлім|chapter|part)\s*[№#]?\s*"
+    r"(?:\d+\b.*"
+    rf"|(?:(?-i:[IVXLCDM]+)|{_ORDINAL_WORDS})\b(?:\s*[.:—–-]\s*\S.*)?)$",
+    re.IGNORECASE,
+)
+MAX_TEXT_HEADING_CHARS = 80
+# Текст до первого заголовка: не "Chapter 1", иначе настоящая первая глава станет дублем
+PREFACE_TITLE = "Preface"
+_MD_HEADING_RE = re.compile(r"^\s{0,3}(#{1,2})\s+(.+?)\s*#*\s*$")
+_WORD_RE = re.compile(r"\w+")
+
+_OPF_NS = {
+    "c": "urn:oasis:names:tc:opendocument:xmlns:container",
+    "opf": "http://www.idpf.org/2007/opf",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+
+
+class BookImportError(ValueError):
+    """Source file cannot be parsed into chapters"""
+
+
+def _clean(value: str) -> str:
+    # NUL в text-колонке Postgres не принимает, а в битых файлах он встречается
+    return value.replace("\x00", "")
+
+
+@dataclass
+class ParsedChapter:
+    title: str
+    content: str
+    word_count: int
+
+    @property
+    def reading_time(self) -> int:
+        return max(1, math.ceil(self.word_count / WORDS_PER_MINUTE))
+
+
+@dataclass
+class BookMetadata:
+    """Metadata found in the source itself (EPUB OPF); all fields optional"""
+    title: Optional[str] = None
+    author: Optional[str] = None
+    language: Optional[str] = None
+    description: Optional[str] = None
+
+
+@dataclass
+class ImportResult:
+    book_id: int
+    total_chapters: int
+    total_words: int
+    estimated_reading_time: int
+
+
+def detect_format(filename: str) -> str:
+    ext = posixpath.splitext(filename.lower())[1].lstrip(".")
+    if ext == "markdown":
+        ext = "md"
+    if ext not in SUPPORTED_FORMATS:
+        raise BookImportError(f"Unsupported file type: {filename} (expected {', '.join(SUPPORTED_FORMATS)})")
+    return ext
+
+
+def _make_chapter(title: str, lines: list[str]) -> Optional[ParsedChapter]:
+    content = _clean("".join(lines)).strip()
+    if not content:
+        return None
+    return ParsedChapter(title=_clean(title).strip()[:255], content=content, word_count=len(_WORD_RE.findall(content)))
+
+
+def _text_heading(line: str) -> Optional[str]:
+    """Heading of a plain-text line, or None for ordinary prose.
+
+    >>> _text_heading("Глава 1. Начало\\n"), _text_heading("CHAPTER IV"), _text_heading("Часть вторая")
+    ('Глава 1. Начало', 'CHAPTER IV', 'Часть вторая')
+    >>> _text_heading("Part of the problem was that he ran."), _text_heading("Глава семьи вернулся домой.")
+    (None, None)
+    >>> _text_heading("Part two of the plan failed."), _text_heading("Part I think was lost.")
+    (None, None)
+    """
+    line = line.strip()
+    if len(line) > MAX_TEXT_HEADING_CHARS or not _TEXT_HEADING_RE.match(line):
+        return None
+    return line
+
+
+def split_text(lines: Iterable[str], markdown: bool = False) -> Iterator[ParsedChapter]:
+    """Split a line stream into chapters at headings.
+
+    Only the current chapter is buffered, and a chapter that outgrows
+    MAX_CHAPTER_CHARS is cut at the next blank line into numbered parts.
+    Text before the first heading becomes its own chapter titled
+    PREFACE_TITLE; a source without any heading is a single "Chapter 1".
+    """
+    title: Optional[str] = None
+    buffer: list[str] = []
+    buffered = 0
+    number = 0
+    part = 1
+
+    for line in lines:
+        if buffered > MAX_CHAPTER_CHARS and not line.strip():
+            base = title or f"Chapter {number + 1}"
+            chapter = _make_chapter(f"{base} ({part})" if part > 1 else base, buffer)
+            if chapter is not None:
+                number += 1
+                yield chapter
+            title, buffer, buffered, part = base, [], 0, part + 1
+            continue
+
+        heading = None
+        if markdown:
+            match = _MD_HEADING_RE.match(line)
+            if match:
+                heading = match.group(2)
+        else:
+            heading = _text_heading(line)
+
+        if heading is None:
+            buffer.append(line)
+            buffered += len(line)
+            continue
+
+        base = title or (PREFACE_TITLE if number == 0 else f"Chapter {number + 1}")
+        chapter = _make_chapter(f"{base} ({part})" if part > 1 else base, buffer)
+        if chapter is not None:
+            number += 1
+            yield chapter
+        title, buffer, buffered, part = heading, [], 0, 1
+
+    base = title or f"Chapter {number + 1}"
+    chapter = _make_chapter(f"{base} ({part})" if part > 1 else base, buffer)
+    if chapter is not None:
+        yield chapter
+
+
+class _XHTMLText(HTMLParser):
+    """Plain text of an XHTML document plus its first heading"""
+
+    _BLOCK_TAGS = {"p", "div", "br", "li", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "blockquote", "section"}
+    _SKIP_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.heading: Optional[str] = None
+        self._heading_parts: Optional[list[str]] = None
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip += 1
+        elif tag in ("h1", "h2", "h3") and self.heading is None:
+            self._heading_parts = []
+        if tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in ("h1", "h2", "h3") and self._heading_parts is not None:
+            self.heading = " ".join(_clean("".join(self._heading_parts)).split()) or None
+            self._heading_parts = None
+        if tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self.parts.append(data)
+        if self._heading_parts is not None:
+            self._heading_parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in _clean("".join(self.parts)).splitlines())
+        return "\n\n".join(line for line in lines if line)
+
+
+def _epub_package(archive: zipfile.ZipFile) -> tuple[str, ElementTree.Element]:
+    try:
+        container = ElementTree.fromstring(archive.read("META-INF/container.xml"))
+        opf_path = container.find(".//c:rootfile", _OPF_NS).attrib["full-path"]
+        return opf_path, ElementTree.fromstring(archive.read(opf_path))
+    except (KeyError, AttributeError, ElementTree.ParseError) as exc:
+        raise BookImportError(f"Not a valid EPUB: {exc}") from exc
+
+
+def _open_epub(source: BinaryIO) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(source)
+    except zipfile.BadZipFile as exc:
+        raise BookImportError(f"Not a valid EPUB: {exc}") from exc
+
+
+def read_epub_metadata(source: BinaryIO) -> BookMetadata:
+    with _open_epub(source) as archive:
+        _, package = _epub_package(archive)
+
+    def text(tag: str) -> Optional[str]:
+        node = package.find(f"opf:metadata/dc:{tag}", _OPF_NS)
+        return _clean(node.text).strip() if node is not None and node.text else None
+
+    language = text("language")
+    return BookMetadata(
+        title=text("title"),
+        author=text("creator"),
+        language=language.split("-")[0].lower() if language else None,
+        description=text("description"),
+    )
+
+
+def split_epub(source: BinaryIO) -> Iterator[ParsedChapter]:
+    """One chapter per spine document; documents without text (covers, blank pages) are skipped.
+
+    The archive is read member by member, so only one document is in memory.
+    """
+    with _open_epub(source) as archive:
+        opf_path, package = _epub_package(archive)
+        base = posixpath.dirname(opf_path)
+        manifest = {
+            item.attrib["id"]: item.attrib["href"]
+            for item in package.iterfind("opf:manifest/opf:item", _OPF_NS)
+        }
+        number = 0
+        for itemref in package.iterfind("opf:spine/opf:itemref", _OPF_NS):
+            href = manifest.get(itemref.attrib.get("idref"))
+            if href is None:
+                continue
+            parser = _XHTMLText()
+            path = posixpath.normpath(posixpath.join(base, href))
+            try:
+                with archive.open(path) as member:
+                    for chunk in iter(lambda: member.read(64 * 1024), b""):
+                        parser.feed(chunk.decode("utf-8", errors="replace"))
+            except (KeyError, zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError) as exc:
+                # отсутствующий файл из spine, битый CRC, неизвестное сжатие, шифрование
+                raise BookImportError(f"Not a valid EPUB: cannot read {path}: {exc}") from exc
+            parser.close()
+            content = parser.text()
+            if not content:
+                continue
+            number += 1
+            yield ParsedChapter(
+                title=(parser.heading or f"Chapter {number}")[:255],
+                content=content,
+                word_count=len(_WORD_RE.findall(content)),
+            )
+
+
+def iter_chapters(source: BinaryIO, fmt: str) -> Iterator[ParsedChapter]:
+    """Chapters of a binary source; EPUB needs a seekable file"""
+    if fmt == "epub":
+        return split_epub(source)
+    lines = io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline=None)
+    return split_text(lines, markdown=(fmt == "md"))
+
+
+def import_book(db: Session, book_fields: dict, chapters: Iterable[ParsedChapter]) -> ImportResult:
+    """Insert a book and COPY its chapters in the session's transaction.
+
+    Totals are counted while the chapters stream into COPY and written back
+    to the book row afterwards. Parse errors and rows rejected by COPY are
+    raised as BookImportError; the transaction is aborted then and the
+    caller rolls back. The caller commits.
+    """
+    book_id = db.execute(insert(Book).values(**book_fields).returning(Book.id)).scalar_one()
+    totals = {"chapters": 0, "words": 0, "minutes": 0}
+    failures: list[BookImportError] = []
+
+    def rows():
+        try:
+            for chapter in chapters:
+                totals["chapters"] += 1
+                totals["words"] += chapter.word_count
+                totals["minutes"] += chapter.reading_time
+                yield (book_id, totals["chapters"], chapter.title, chapter.content, chapter.reading_time)
+        except BookImportError as exc:
+            # psycopg2 отменяет COPY и отдаёт QueryCanceled — исходную причину запоминаем
+            failures.append(exc)
+            raise
+
+    try:
+        copy_rows(
+            db.connection(),
+            "chapters",
+            ("book_id", "chapter_number", "title", "content", "estimated_reading_time"),
+            rows(),
+        )
+    except psycopg2.Error as exc:
+        if failures:
+            raise failures[0] from exc
+        raise BookImportError(f"Chapters rejected by the database: {exc.diag.message_primary or exc}") from exc
+    if totals["chapters"] == 0:
+        raise BookImportError("No chapters found in the source")
+
+    db.execute(
+        update(Book)
+        .where(Book.id == book_id)
+        .values(total_chapters=totals["chapters"], estimated_reading_time=totals["minutes"])
+    )
+    return ImportResult(
+        book_id=book_id,
+        total_chapters=totals["chapters"],
+        total_words=totals["words"],
+        estimated_reading_time=totals["minutes"],
+    )
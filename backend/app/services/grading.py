@@ -1,47 +1,65 @@
-from typing import List, Dict, Tuple
-from ..models import Question, Option, QuestionType
+from dataclasses import dataclass
+from typing import List, Dict, FrozenSet, Tuple
+from ..models import Question, QuestionType
 
 
-def grade_single_multi(selected_option_ids: List[int], options: List[Option], multi: bool) -> bool:
-    correct_ids = {opt.id for opt in options if opt.is_correct}
+@dataclass(frozen=True)
+class QuestionKey:
+    """Answer key of a single question, compiled once from its options"""
+    id: int
+    type: QuestionType
+    score: int
+    correct_ids: FrozenSet[int]
+    ordering: Tuple[int, ...]
+    match_keys: FrozenSet[str]
+
+
+def compile_question(question: Question) -> QuestionKey:
+    options = question.options
+    return QuestionKey(
+        id=question.id,
+        type=question.type,
+        score=question.score if question.score is not None else 1,
+        correct_ids=frozenset(opt.id for opt in options if opt.is_correct),
+        ordering=tuple(opt.id for opt in sorted(options, key=lambda o: (o.order_index or 0))),
+        match_keys=frozenset(opt.match_key for opt in options if opt.match_key is not None),
+    )
+
+
+def grade_single_multi(selected_option_ids: List[int], correct_ids: FrozenSet[int], multi: bool) -> bool:
     selected_ids = set(selected_option_ids or [])
     if not multi and len(selected_ids) != 1:
         return False
     return selected_ids == correct_ids
 
 
-def grade_ordering(ordering: List[int], options: List[Option]) -> bool:
-    expected = [opt.id for opt in sorted(options, key=lambda o: (o.order_index or 0))]
-    return ordering == expected
+def grade_ordering(ordering: List[int], expected: Tuple[int, ...]) -> bool:
+    return tuple(ordering or ()) == expected
 
 
-def grade_matching(matches: Dict[str, str], options: List[Option]) -> bool:
+def grade_matching(matches: Dict[str, str], match_keys: FrozenSet[str]) -> bool:
     # Для простоты: считаем, что у опций есть match_key, пары верны если ключи совпали по ожиданию.
     # Ожидаем соответствие: левый элемент (у которого match_key не None) → правый с тем же match_key.
     # Матч выражен как left_key -> right_key.
     if not matches:
         return False
-    # соберём множество пар из опций
-    keys = [opt.match_key for opt in options if opt.match_key is not None]
-    unique_keys = set(keys)
     # правильные пары: k -> k для каждого k
     for k, v in matches.items():
-        if k not in unique_keys or v not in unique_keys or k != v:
+        if k not in match_keys or v not in match_keys or k != v:
             return False
     return True
 
 
-def grade_question(question: Question, submission_payload: dict) -> bool:
+def grade_question(question: QuestionKey, submission_payload: dict) -> bool:
     qtype = question.type
-    options = question.options
     if qtype == QuestionType.SINGLE_CHOICE:
-        return grade_single_multi(submission_payload.get("selected_option_ids", []), options, multi=False)
+        return grade_single_multi(submission_payload.get("selected_option_ids", []), question.correct_ids, multi=False)
     if qtype == QuestionType.MULTI_CHOICE:
-        return grade_single_multi(submission_payload.get("selected_option_ids", []), options, multi=True)
+        return grade_single_multi(submission_payload.get("selected_option_ids", []), question.correct_ids, multi=True)
     if qtype == QuestionType.ORDERING:
-        return grade_ordering(submission_payload.get("ordering", []), options)
+        return grade_ordering(submission_payload.get("ordering", []), question.ordering)
     if qtype == QuestionType.MATCHING:
-        return grade_matching(submission_payload.get("matches", {}), options)
+        return grade_matching(submission_payload.get("matches", {}), question.match_keys)
     return False
 
 
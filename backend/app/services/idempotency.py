@@ -0,0 +1,80 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(method: str, path: str, body: Any) -> str:
+    """Hash of what a retry must repeat exactly to be replayed"""
+    canonical = json.dumps([method, path, body], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def claim_key(db: AsyncSession, user_id: int, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    """Start handling a keyed request; return the stored result if it was handled already.
+
+    Must be the first write of the caller's transaction. None means the key
+    is ours: the caller does the work and calls `store_result` before
+    committing. While that transaction is open, the same INSERT from a
+    concurrent duplicate waits on the unique key, then finds the committed
+    result (or claims the key itself if the first attempt rolled back).
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_KEY_LENGTH} characters",
+        )
+    claimed = (await db.execute(
+        insert(IdempotencyKey)
+        .values(user_id=user_id, key=key, request_hash=request_hash)
+        .on_conflict_do_nothing(index_elements=[IdempotencyKey.user_id, IdempotencyKey.key])
+        .returning(IdempotencyKey.key)
+    )).first()
+    if claimed is not None:
+        return None
+
+    stored = await db.scalar(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request",
+        )
+    return stored
+
+
+async def store_result(db: AsyncSession, user_id: int, key: str, status_code: int, body: Any) -> None:
+    """Attach the response to a claimed key; commits with the caller's transaction"""
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, response=body)
+    )
+
+
+def purge_keys(db: Session, older_than: datetime, batch_size: int = 10_000) -> int:
+    """Delete stored results created before `older_than` in short batches; returns rows deleted"""
+    total = 0
+    while True:
+        batch = select(IdempotencyKey.user_id, IdempotencyKey.key).where(
+            IdempotencyKey.created_at < older_than
+        ).limit(batch_size)
+        deleted = db.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(batch))
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,141 @@
+import math
+from typing import Iterable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Option, OptionStat, Question, QuestionStat, QuestionType
+from .grading import QuestionKey
+
+_CHOICE_TYPES = (QuestionType.SINGLE_CHOICE, QuestionType.MULTI_CHOICE)
+
+
+async def record_item_stats(
+    db: AsyncSession,
+    questions: Iterable[QuestionKey],
+    graded: Iterable[tuple[QuestionKey, dict, bool]],
+    score_fraction: float,
+) -> None:
+    """Add one submission to the per-question and per-option counters.
+
+    `questions` are all questions of the quiz: a skipped one counts as an
+    incorrect attempt, so difficulty is not inflated by skipping. `graded`
+    holds (question key, answer payload, correct) for every answered
+    question. This runs at most two upserts in the caller's transaction.
+    Rows are sorted by key, so concurrent submissions lock counter rows in
+    the same order and cannot deadlock; the caller runs this last before
+    its commit, so the row locks are held only briefly.
+    """
+    answers: dict[int, tuple[dict, bool]] = {}
+    for key, payload, is_correct in graded:
+        answers.setdefault(key.id, (payload, is_correct))  # повтор вопроса в одной отправке считаем один раз
+
+    counters: dict[int, dict] = {}
+    picks: dict[int, int] = {}
+    for key in questions:
+        payload, is_correct = answers.get(key.id, ({}, False))
+        counters[key.id] = {
+            "question_id": key.id,
+            "attempts": 1,
+            "correct": int(is_correct),
+            "score_sum": score_fraction,
+            "score_sq_sum": score_fraction * score_fraction,
+            "score_sum_correct": score_fraction if is_correct else 0.0,
+        }
+        if key.type in _CHOICE_TYPES:
+            valid = set(key.ordering)  # все варианты вопроса
+            for option_id in set(payload.get("selected_option_ids") or ()):
+                if option_id in valid:
+                    picks[option_id] = key.id
+
+    if counters:
+        stmt = insert(QuestionStat).values([counters[qid] for qid in sorted(counters)])
+        t = QuestionStat.__table__.c
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[QuestionStat.question_id],
+            set_={
+                "attempts": t.attempts + stmt.excluded.attempts,
+                "correct": t.correct + stmt.excluded.correct,
+                "score_sum": t.score_sum + stmt.excluded.score_sum,
+                "score_sq_sum": t.score_sq_sum + stmt.excluded.score_sq_sum,
+                "score_sum_correct": t.score_sum_correct + stmt.excluded.score_sum_correct,
+                "updated_at": func.now(),
+            },
+        ))
+
+    if picks:
+        stmt = insert(OptionStat).values([
+            {"option_id": option_id, "question_id": picks[option_id], "picks": 1}
+            for option_id in sorted(picks)
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[OptionStat.option_id],
+            set_={"picks": OptionStat.__table__.c.picks + 1},
+        ))
+
+
+def discrimination_index(stat) -> Optional[float]:
+    """Point-biserial correlation between answering correctly and the attempt score"""
+    n, n1 = stat.attempts or 0, stat.correct or 0
+    if n < 2 or n1 == 0 or n1 == n:
+        return None
+    mean = stat.score_sum / n
+    variance = stat.score_sq_sum / n - mean * mean
+    if variance <= 1e-12:
+        return None
+    mean_correct = stat.score_sum_correct / n1
+    mean_incorrect = (stat.score_sum - stat.score_sum_correct) / (n - n1)
+    p = n1 / n
+    return (mean_correct - mean_incorrect) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+
+
+async def quiz_item_stats(db: AsyncSession, quiz_id: int) -> list[dict]:
+    """Difficulty, discrimination and option pick rates of every question of a quiz.
+
+    Two queries (questions, options), each joined with its counters: the
+    cost is O(questions + options), independent of how many answers exist.
+    """
+    question_rows = (await db.execute(
+        select(
+            Question.id, Question.type, Question.text, Question.order_index,
+            QuestionStat.attempts, QuestionStat.correct, QuestionStat.score_sum,
+            QuestionStat.score_sq_sum, QuestionStat.score_sum_correct,
+        )
+        .outerjoin(QuestionStat, QuestionStat.question_id == Question.id)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order_index, Question.id)
+    )).all()
+    option_rows = (await db.execute(
+        select(Option.id, Option.question_id, Option.text, Option.is_correct, OptionStat.picks)
+        .join(Question, Question.id == Option.question_id)
+        .outerjoin(OptionStat, OptionStat.option_id == Option.id)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Option.question_id, Option.order_index, Option.id)
+    )).all()
+
+    attempts_by_question = {row.id: row.attempts or 0 for row in question_rows}
+    options_by_question: dict[int, list[dict]] = {}
+    for row in option_rows:
+        attempts = attempts_by_question.get(row.question_id, 0)
+        picks = row.picks or 0
+        options_by_question.setdefault(row.question_id, []).append({
+            "option_id": row.id,
+            "text": row.text,
+            "is_correct": row.is_correct,
+            "picks": picks,
+            "pick_rate": picks / attempts if attempts else None,
+        })
+
+    return [
+        {
+            "question_id": row.id,
+            "type": row.type,
+            "text": row.text,
+            "order_index": row.order_index or 0,
+            "attempts": row.attempts or 0,
+            "correct": row.correct or 0,
+            "difficulty": row.correct / row.attempts if row.attempts else None,
+            "discrimination": discrimination_index(row),
+            "options": options_by_question.get(row.id, []),
+        }
+        for row in question_rows
+    ]
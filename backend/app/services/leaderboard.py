@@ -0,0 +1,89 @@
+import bisect
+import threading
+import time
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..models import User
+
+
+class Leaderboard:
+    """In-memory ranking of active users by total XP.
+
+    Entries are kept sorted as (-total_xp, user_id), so a rank lookup is a
+    single bisect. Each worker holds its own copy: local writes are applied
+    immediately and the whole board is reloaded from the total_xp index every
+    LEADERBOARD_REFRESH_SECONDS to pick up writes made by other workers.
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[int, int]] = []
+        self._scores: dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > settings.LEADERBOARD_REFRESH_SECONDS
+
+    def load(self, rows) -> None:
+        """Replace the board with (user_id, total_xp) rows"""
+        scores = {user_id: total_xp or 0 for user_id, total_xp in rows}
+        entries = sorted((-xp, user_id) for user_id, xp in scores.items())
+        with self._lock:
+            self._scores = scores
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def update(self, user_id: int, total_xp: int) -> None:
+        total_xp = total_xp or 0
+        with self._lock:
+            self._discard(user_id)
+            self._scores[user_id] = total_xp
+            bisect.insort(self._entries, (-total_xp, user_id))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._discard(user_id)
+
+    def _discard(self, user_id: int) -> None:
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            i = bisect.bisect_left(self._entries, (-old, user_id))
+            if i < len(self._entries) and self._entries[i] == (-old, user_id):
+                del self._entries[i]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based competition rank: users with equal XP share a rank"""
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return None
+            return bisect.bisect_left(self._entries, (-score,)) + 1
+
+    def top(self, n: int) -> list[tuple[int, int, int]]:
+        """Return [(rank, user_id, total_xp)] of the first ``n`` entries"""
+        with self._lock:
+            head = self._entries[:n]
+            return [
+                (bisect.bisect_left(self._entries, (neg_xp,)) + 1, user_id, -neg_xp)
+                for neg_xp, user_id in head
+            ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+leaderboard = Leaderboard()
+
+
+async def ensure_leaderboard(db: AsyncSession) -> Leaderboard:
+    """Reload the board from the database when it is missing or too old"""
+    if leaderboard.is_stale():
+        rows = await db.execute(
+            select(User.id, User.total_xp)
+            .where(User.is_active == True)
+            .order_by(User.total_xp.desc(), User.id)
+        )
+        leaderboard.load(rows.all())
+    return leaderboard
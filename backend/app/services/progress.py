@@ -0,0 +1,100 @@
+from typing import Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Book, ReadingProgress
+
+PROGRESS_STATUSES = ("reading", "completed", "abandoned")
+
+_progress = ReadingProgress.__table__
+_columns = tuple(_progress.c)
+
+
+def _upsert(values: dict, set_: dict):
+    return (
+        insert(ReadingProgress)
+        .values(**values)
+        .on_conflict_do_update(constraint="uq_user_book_progress", set_=set_)
+        .returning(*_columns)
+    )
+
+
+async def upsert_progress(
+    db: AsyncSession,
+    user_id: int,
+    book_id: int,
+    fields: Optional[dict] = None,
+):
+    """Create or update the progress row of a user's book in one statement.
+
+    Only the given fields are overwritten on conflict; last_read_at is always
+    bumped. Marking a book completed stamps completed_at once.
+    """
+    fields = dict(fields or {})
+    now = func.now()
+    set_ = {**fields, "last_read_at": now}
+    if fields.get("status") == "completed":
+        fields["completed_at"] = now
+        set_["completed_at"] = func.coalesce(_progress.c.completed_at, now)
+
+    result = await db.execute(_upsert({"user_id": user_id, "book_id": book_id, **fields}, set_))
+    return result.mappings().one()
+
+
+async def record_chapter_passed(
+    db: AsyncSession,
+    user_id: int,
+    book_id: int,
+    chapter_number: int,
+    total_chapters: Optional[int],
+) -> None:
+    """Advance progress after a perfect quiz, creating the row if needed.
+
+    Progress never moves backwards: re-passing an earlier chapter only
+    refreshes last_read_at.
+    """
+    total = max(total_chapters or 0, chapter_number)
+    completed = func.greatest(_progress.c.chapters_completed, chapter_number)
+    finished = completed >= total
+    now = func.now()
+
+    await db.execute(_upsert(
+        {
+            "user_id": user_id,
+            "book_id": book_id,
+            "chapters_completed": chapter_number,
+            "current_chapter": min(chapter_number + 1, total),
+            "status": "completed" if chapter_number >= total else "reading",
+            "completed_at": now if chapter_number >= total else None,
+        },
+        {
+            "chapters_completed": completed,
+            "current_chapter": case(
+                (_progress.c.chapters_completed < chapter_number, min(chapter_number + 1, total)),
+                else_=_progress.c.current_chapter,
+            ),
+            "status": case((finished, "completed"), else_=_progress.c.status),
+            "completed_at": case(
+                (finished, func.coalesce(_progress.c.completed_at, now)),
+                else_=_progress.c.completed_at,
+            ),
+            "last_read_at": now,
+        },
+    ))
+
+
+async def get_library(db: AsyncSession, user_id: int) -> list:
+    """All progress rows of a user with their book details, most recently read first"""
+    result = await db.execute(
+        select(
+            *_columns,
+            Book.title.label("book_title"),
+            Book.author.label("book_author"),
+            Book.cover_image_url.label("book_cover_url"),
+            func.coalesce(Book.total_chapters, 0).label("total_chapters"),
+        )
+        .join(Book, Book.id == _progress.c.book_id)
+        .where(_progress.c.user_id == user_id)
+        .order_by(_progress.c.last_read_at.desc().nulls_last(), _progress.c.id.desc())
+    )
+    return result.mappings().all()
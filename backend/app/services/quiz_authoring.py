@@ -0,0 +1,183 @@
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Answer, Chapter, Option, Question, QuestionStat, QuestionType, Quiz
+from ..schemas import QuizTree
+
+_MIN_OPTIONS = 2
+
+
+def validate_quiz_tree(tree: QuizTree) -> list[str]:
+    """Structural checks of a quiz document; returns every problem found, not just the first"""
+    errors: list[str] = []
+    seen_questions: set[int] = set()
+    seen_options: set[int] = set()
+
+    for i, question in enumerate(tree.questions):
+        where = f"questions[{i}]"
+        if question.id is not None:
+            if question.id in seen_questions:
+                errors.append(f"{where}: duplicate question id {question.id}")
+            seen_questions.add(question.id)
+        if not question.text.strip():
+            errors.append(f"{where}: text is empty")
+        if question.score < 0:
+            errors.append(f"{where}: score must not be negative")
+
+        options = question.options
+        if len(options) < _MIN_OPTIONS:
+            errors.append(f"{where}: needs at least {_MIN_OPTIONS} options")
+
+        order = [o.order_index for o in options if o.order_index is not None]
+        if len(order) != len(set(order)):
+            errors.append(f"{where}: option order_index values must be unique")
+
+        for j, option in enumerate(options):
+            if option.id is not None:
+                if option.id in seen_options:
+                    errors.append(f"{where}.options[{j}]: duplicate option id {option.id}")
+                seen_options.add(option.id)
+            if not option.text.strip():
+                errors.append(f"{where}.options[{j}]: text is empty")
+
+        correct = sum(1 for o in options if o.is_correct)
+        if question.type == QuestionType.SINGLE_CHOICE and correct != 1:
+            errors.append(f"{where}: single_choice needs exactly one correct option")
+        elif question.type == QuestionType.MULTI_CHOICE and correct < 1:
+            errors.append(f"{where}: multi_choice needs at least one correct option")
+        elif question.type == QuestionType.ORDERING and len(order) != len(options):
+            errors.append(f"{where}: every ordering option needs an order_index")
+        elif question.type == QuestionType.MATCHING and any(o.match_key is None for o in options):
+            errors.append(f"{where}: every matching option needs a match_key")
+
+    return errors
+
+
+async def _existing_tree(db: AsyncSession, quiz_id: int) -> dict[int, set[int]]:
+    rows = await db.execute(
+        select(Question.id, Option.id.label("option_id"))
+        .outerjoin(Option, Option.question_id == Question.id)
+        .where(Question.quiz_id == quiz_id)
+    )
+    tree: dict[int, set[int]] = {}
+    for question_id, option_id in rows:
+        options = tree.setdefault(question_id, set())
+        if option_id is not None:
+            options.add(option_id)
+    return tree
+
+
+def _option_row(option, question_id: int) -> dict:
+    return {
+        "question_id": question_id,
+        "text": option.text,
+        "is_correct": bool(option.is_correct),
+        "order_index": option.order_index,
+        "match_key": option.match_key,
+    }
+
+
+async def save_quiz_tree(db: AsyncSession, chapter_id: int, tree: QuizTree) -> int:
+    """Create or re-author the quiz of a chapter from a full document.
+
+    The quiz row is upserted first, which also locks it against concurrent
+    re-authoring. After that there is one statement per kind of change
+    (delete, bulk update by primary key, bulk insert), all in the
+    session's transaction. The caller commits and invalidates caches.
+    """
+    if await db.scalar(select(Chapter.id).where(Chapter.id == chapter_id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chapter not found")
+
+    quiz_fields = tree.model_dump(exclude={"questions"})
+    quiz_id = await db.scalar(
+        pg_insert(Quiz)
+        .values(chapter_id=chapter_id, **quiz_fields)
+        .on_conflict_do_update(index_elements=[Quiz.chapter_id], set_={**quiz_fields, "updated_at": func.now()})
+        .returning(Quiz.id)
+    )
+    existing = await _existing_tree(db, quiz_id)
+
+    kept_options: set[int] = set()
+    for question in tree.questions:
+        if question.id is not None and question.id not in existing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question {question.id} does not belong to this quiz",
+            )
+        allowed = existing.get(question.id, set())
+        for option in question.options:
+            if option.id is None:
+                continue
+            if option.id not in allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Option {option.id} does not belong to question {question.id}",
+                )
+            kept_options.add(option.id)
+
+    kept_questions = {q.id for q in tree.questions if q.id is not None}
+    removed_questions = existing.keys() - kept_questions
+    removed_options = set().union(*(existing[q] for q in kept_questions)) - kept_options
+
+    if removed_questions:
+        # question_stats растёт в транзакции отправки, поэтому видит и попытки, которые
+        # ещё ждут в очереди write-behind; answers — историю до появления статистики
+        answered = await db.scalar(
+            select(QuestionStat.question_id)
+            .where(QuestionStat.question_id.in_(removed_questions), QuestionStat.attempts > 0)
+            .limit(1)
+        )
+        if answered is None:
+            answered = await db.scalar(
+                select(Answer.question_id).where(Answer.question_id.in_(removed_questions)).limit(1)
+            )
+        if answered is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Question {answered} already has answers and cannot be removed",
+            )
+
+    # Удаления
+    if removed_questions or removed_options:
+        await db.execute(delete(Option).where(or_(
+            Option.id.in_(removed_options),
+            Option.question_id.in_(removed_questions),
+        )))
+    if removed_questions:
+        await db.execute(delete(Question).where(Question.id.in_(removed_questions)))
+
+    # Обновления на месте. order_index сначала обнуляем, иначе перестановка
+    # вариантов нарушит uq_option_order_per_question посреди executemany
+    question_updates = [
+        {"id": q.id, **q.model_dump(exclude={"id", "options"})}
+        for q in tree.questions if q.id is not None
+    ]
+    option_updates = [
+        {"id": o.id, **_option_row(o, q.id)}
+        for q in tree.questions if q.id is not None
+        for o in q.options if o.id is not None
+    ]
+    if question_updates:
+        await db.execute(update(Question), question_updates)
+    if option_updates:
+        await db.execute(update(Option).where(Option.id.in_(kept_options)).values(order_index=None))
+        await db.execute(update(Option), option_updates)
+
+    # Вставки: новые вопросы одним INSERT ... RETURNING, затем все новые варианты
+    new_questions = [q for q in tree.questions if q.id is None]
+    new_ids: list[int] = []
+    if new_questions:
+        new_ids = list(await db.scalars(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            [{"quiz_id": quiz_id, **q.model_dump(exclude={"id", "options"})} for q in new_questions],
+        ))
+    new_id_iter = iter(new_ids)
+    option_inserts = []
+    for question in tree.questions:
+        question_id = question.id if question.id is not None else next(new_id_iter)
+        option_inserts.extend(_option_row(o, question_id) for o in question.options if o.id is None)
+    if option_inserts:
+        await db.execute(insert(Option), option_inserts)
+
+    return quiz_id
@@ -0,0 +1,96 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.responses import dumps, schema_columns
+from ..models import Quiz, Question, Option
+from ..schemas import QuizPublic
+from ..schemas.quiz import QuestionPublic, OptionPublic
+
+
+@dataclass(frozen=True)
+class QuizPayload:
+    """Serialized public quiz JSON with its entity tag"""
+    body: bytes
+    etag: str
+
+
+_payloads = TTLCache(settings.QUIZ_PAYLOAD_CACHE_SIZE, settings.QUIZ_PAYLOAD_CACHE_TTL_SECONDS)
+
+# Колонки публичной выдачи в порядке полей схем; вложенные списки собираем сами
+_QUIZ_COLUMNS = schema_columns(Quiz, QuizPublic, exclude=("questions",))
+_QUESTION_COLUMNS = schema_columns(Question, QuestionPublic, exclude=("options",))
+_OPTION_COLUMNS = schema_columns(Option, OptionPublic)
+
+
+async def load_quiz_tree(db: AsyncSession, *criteria) -> Optional[Quiz]:
+    """Load a quiz with its questions and options in a single query"""
+    result = await db.execute(
+        select(Quiz)
+        .options(joinedload(Quiz.questions).joinedload(Question.options))
+        .where(*criteria)
+    )
+    return result.unique().scalars().first()
+
+
+async def fetch_public_quiz(db: AsyncSession, chapter_id: int) -> Optional[dict]:
+    """Public quiz document of a chapter built from plain rows, shaped like QuizPublic"""
+    quiz = (await db.execute(
+        select(*_QUIZ_COLUMNS).where(Quiz.chapter_id == chapter_id, Quiz.is_active == True)
+    )).first()
+    if quiz is None:
+        return None
+
+    rows = await db.execute(
+        select(
+            *(c.label(f"q_{c.name}") for c in _QUESTION_COLUMNS),
+            *(c.label(f"o_{c.name}") for c in _OPTION_COLUMNS),
+        )
+        .select_from(Question)
+        .outerjoin(Option, Option.question_id == Question.id)
+        .where(Question.quiz_id == quiz.id)
+        .order_by(Question.order_index, Question.id, Option.order_index, Option.id)
+    )
+
+    questions: list[dict] = []
+    for row in rows.mappings():
+        if not questions or questions[-1]["id"] != row["q_id"]:
+            question = {c.name: row[f"q_{c.name}"] for c in _QUESTION_COLUMNS}
+            question["options"] = []
+            questions.append(question)
+        if row["o_id"] is not None:
+            questions[-1]["options"].append({c.name: row[f"o_{c.name}"] for c in _OPTION_COLUMNS})
+
+    document = quiz._asdict()
+    document["questions"] = questions
+    return document
+
+
+def build_quiz_payload(document: dict) -> QuizPayload:
+    body = dumps(document)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return QuizPayload(body=body, etag=etag)
+
+
+async def get_quiz_payload(db: AsyncSession, chapter_id: int) -> Optional[QuizPayload]:
+    """Return the public payload of the active quiz of a chapter, without correct answers"""
+    payload = _payloads.get(chapter_id)
+    if payload is not None:
+        return payload
+
+    generation = _payloads.generation
+    document = await fetch_public_quiz(db, chapter_id)
+    if document is None:
+        return None
+    payload = build_quiz_payload(document)
+    _payloads.set(chapter_id, payload, generation=generation)
+    return payload
+
+
+def invalidate_quiz_payload(chapter_id: int) -> None:
+    """Drop the cached payload of a chapter in this process; other workers wait out the TTL"""
+    _payloads.pop(chapter_id)
@@ -0,0 +1,96 @@
+from sqlalchemy import and_, case, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Book, Chapter
+from ..models.search import TS_CONFIGS, DEFAULT_TS_CONFIG
+
+HEADLINE_OPTIONS = "MaxFragments=2, MinWords=8, MaxWords=25, StartSel=<b>, StopSel=</b>"
+
+
+def _tsquery(config: str, q: str):
+    return func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), q)
+
+
+def _language_branches(language_col, q: str) -> list[tuple]:
+    """(row condition, tsquery) for each configuration.
+
+    Every branch uses a constant configuration, so each `@@` can be served by
+    the GIN index and the planner combines them with a BitmapOr.
+    """
+    branches = [(language_col == lang, _tsquery(cfg, q)) for lang, cfg in TS_CONFIGS.items()]
+    branches.append((
+        or_(language_col.is_(None), language_col.notin_(list(TS_CONFIGS))),
+        _tsquery(DEFAULT_TS_CONFIG, q),
+    ))
+    return branches
+
+
+def _match_and_rank(vector_col, language_col, q: str):
+    branches = _language_branches(language_col, q)
+    match = or_(*(and_(cond, vector_col.op("@@")(tsq)) for cond, tsq in branches))
+    rank = case(*((cond, func.ts_rank_cd(vector_col, tsq)) for cond, tsq in branches), else_=0)
+    return match, rank
+
+
+async def search_books(db: AsyncSession, q: str, limit: int) -> list:
+    match, rank = _match_and_rank(Book.search_vector, Book.language, q)
+    rows = await db.execute(
+        select(Book.id, Book.title, Book.author, Book.cover_image_url, Book.language, rank.label("rank"))
+        .where(match)
+        .order_by(rank.desc(), Book.id)
+        .limit(limit)
+    )
+    return rows.all()
+
+
+async def search_chapters(db: AsyncSession, q: str, limit: int, book_id: int | None = None) -> list:
+    match, rank = _match_and_rank(Chapter.search_vector, Book.language, q)
+    query = (
+        select(
+            Chapter.id,
+            Chapter.book_id,
+            Chapter.chapter_number,
+            Chapter.title,
+            Book.title.label("book_title"),
+            Book.language,
+            rank.label("rank"),
+        )
+        .join(Book, Book.id == Chapter.book_id)
+        .where(match)
+        .order_by(rank.desc(), Chapter.id)
+        .limit(limit)
+    )
+    if book_id is not None:
+        query = query.where(Chapter.book_id == book_id)
+    top = query.subquery()
+
+    # ts_headline дорогой: считаем сниппеты только для уже отобранных строк
+    config = func.bookquest_ts_config(top.c.language)
+    snippet = func.ts_headline(
+        config,
+        Chapter.content,
+        func.websearch_to_tsquery(config, q),
+        HEADLINE_OPTIONS,
+    )
+    rows = await db.execute(
+        select(top, snippet.label("snippet"))
+        .join(Chapter, Chapter.id == top.c.id)
+        .order_by(top.c.rank.desc(), top.c.id)
+    )
+    return rows.all()
+
+
+async def autocomplete(db: AsyncSession, q: str, limit: int) -> list:
+    """Title/author suggestions: prefix matches and trigram similarity, best first"""
+    similarity = func.greatest(func.similarity(Book.title, q), func.similarity(Book.author, q))
+    rows = await db.execute(
+        select(Book.id, Book.title, Book.author)
+        .where(or_(
+            Book.title.istartswith(q, autoescape=True),
+            Book.author.istartswith(q, autoescape=True),
+            Book.title.op("%")(q),
+            Book.author.op("%")(q),
+        ))
+        .order_by(similarity.desc(), Book.id)
+        .limit(limit)
+    )
+    return rows.all()
@@ -1,70 +1,143 @@
+import bisect
+from sqlalchemy import BigInteger, Integer, bindparam, case, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.expression import Grouping
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
 from ..core.config import settings
 from ..models import User, Quiz
 
+MAX_LEVEL = 1000
+
 def xp_for_level(level: int) -> int:
     """Calculate XP needed to reach next level"""
     return int(500 * (level ** 1.5))
 
-def check_level_up(user: User) -> tuple[bool, int, list[int]]:
-    """
-    Check if user should level up
-    Returns: (leveled_up, new_level, levels_gained)
-    """
-    leveled_up = False
-    levels_gained = []
-    
-    while user.current_xp >= xp_for_level(user.level):
-        user.current_xp -= xp_for_level(user.level)
-        user.level += 1
-        levels_gained.append(user.level)
-        leveled_up = True
-    
-    return leveled_up, user.level, levels_gained
-
-def compute_quiz_xp(quiz: Quiz, is_perfect: bool, user: User) -> int:
-    """Calculate XP earned from quiz"""
+def _build_level_thresholds() -> list[int]:
+    thresholds = [0]
+    for level in range(1, MAX_LEVEL):
+        thresholds.append(thresholds[-1] + xp_for_level(level))
+    return thresholds
+
+# LEVEL_THRESHOLDS[L - 1] — суммарный XP, с которого начинается уровень L
+LEVEL_THRESHOLDS = _build_level_thresholds()
+
+def level_threshold(level: int) -> int:
+    """Cumulative XP at which ``level`` starts"""
+    return LEVEL_THRESHOLDS[min(max(level, 1), MAX_LEVEL) - 1]
+
+def level_for_xp(cumulative_xp: int) -> int:
+    """Level reached with ``cumulative_xp`` earned since level 1 (capped at MAX_LEVEL)"""
+    return max(1, bisect.bisect_right(LEVEL_THRESHOLDS, cumulative_xp))
+
+def quiz_base_xp(quiz: Quiz) -> int:
+    """XP of a quiz before the streak bonus"""
     base = quiz.quiz_xp if quiz.quiz_xp is not None else 0
     if base == 0:
         try:
             base = quiz.chapter.book.chapter_xp or 0
         except Exception:
             base = settings.QUIZ_BASE_XP
-    
-    bonus = 0
-    if is_perfect and settings.STREAK_STEP > 0:
-        next_streak = (user.reading_streak or 0) + 1
-        if next_streak % settings.STREAK_STEP == 0:
-            bonus = settings.STREAK_BONUS_XP
-    
-    return base + bonus
-
-def apply_quiz_result(db: Session, user: User, quiz: Quiz, is_perfect: bool, xp_earned: int) -> dict:
+    return base
+
+def streak_bonus(streak: int) -> int:
+    """Bonus for a perfect quiz that brought the streak to ``streak``"""
+    if settings.STREAK_STEP > 0 and streak > 0 and streak % settings.STREAK_STEP == 0:
+        return settings.STREAK_BONUS_XP
+    return 0
+
+def _thresholds():
+    # кривая уровней одним массивом: PG-индексация с 1, thresholds[L] — начало уровня L.
+    # Скобки обязательны: "$1::BIGINT[][i]" Postgres не разбирает, "($1::BIGINT[])[i]" — да
+    return Grouping(bindparam("thresholds", LEVEL_THRESHOLDS, type_=ARRAY(BigInteger)))
+
+async def apply_quiz_result(db: AsyncSession, user_id: int, base_xp: int, is_perfect: bool) -> dict:
     """
-    Apply quiz results to user (XP, streak, level)
-    Returns dict with level_up info
+    Apply a quiz result to the user (streak, XP incl. streak bonus, level)
+    with one UPDATE ... RETURNING. Every value is computed from the row
+    as it is when the UPDATE locks it, so concurrent submits of the same
+    user queue on the row lock (until the caller commits) instead of
+    overwriting each other's increments. Does not commit; the caller
+    drops the cached user snapshot and moves the user on the leaderboard
+    (new total_xp is returned) after its commit.
+    Returns dict with the XP earned and level_up info
     """
-    # Update streak
+    streak = func.coalesce(User.reading_streak, 0)
     if is_perfect:
-        user.reading_streak = (user.reading_streak or 0) + 1
+        new_streak = streak + 1
+        bonus = (
+            case((new_streak % settings.STREAK_STEP == 0, settings.STREAK_BONUS_XP), else_=0)
+            if settings.STREAK_STEP > 0 else 0
+        )
     else:
-        user.reading_streak = 0
-    
-    # Add XP
-    user.current_xp = (user.current_xp or 0) + xp_earned
-    user.total_xp = (user.total_xp or 0) + xp_earned
-    
-    # Check for level up
-    leveled_up, new_level, levels_gained = check_level_up(user)
-    
-    # Update last reading date
-    user.last_reading_date = datetime.utcnow()
-    
-    db.add(user)
-    
+        new_streak, bonus = 0, 0
+    xp = base_xp + bonus
+
+    thresholds = _thresholds()
+    cumulative = thresholds[func.coalesce(User.level, 1)] + func.coalesce(User.current_xp, 0) + xp
+    new_level = func.width_bucket(cumulative, thresholds)
+
+    row = (await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            reading_streak=new_streak,
+            level=new_level,
+            current_xp=cumulative - thresholds[new_level],
+            total_xp=func.coalesce(User.total_xp, 0) + xp,
+            last_reading_date=func.now(),
+        )
+        .returning(User.level, User.current_xp, User.total_xp, User.reading_streak)
+        .execution_options(synchronize_session=False)
+    )).one()
+
+    # Бонус и прежний уровень восстанавливаются из нового состояния строки, без чтения до UPDATE
+    xp_earned = base_xp + (streak_bonus(row.reading_streak) if is_perfect else 0)
+    previous_level = level_for_xp(level_threshold(row.level) + row.current_xp - xp_earned)
+
     return {
-        "leveled_up": leveled_up,
-        "new_level": new_level,
-        "levels_gained": levels_gained,
-    }
\ No newline at end of file
+        "xp_earned": xp_earned,
+        "reading_streak": row.reading_streak,
+        "total_xp": row.total_xp,
+        "leveled_up": row.level > previous_level,
+        "new_level": row.level,
+        "levels_gained": list(range(previous_level + 1, row.level + 1)),
+    }
+
+def grant_xp_batch(db: Session, awards: dict[int, int]) -> list[dict]:
+    """
+    Add XP to many users with one UPDATE ... FROM unnest(...) statement.
+    Levels are derived in SQL from the precomputed curve via width_bucket,
+    so there is no read-modify-write per user. Does not commit; the caller
+    invalidates cached user snapshots after committing.
+    Returns [{"user_id", "level", "current_xp", "total_xp"}] for updated users.
+    """
+    if not awards:
+        return []
+
+    grants = select(
+        func.unnest(bindparam("user_ids", list(awards), type_=ARRAY(Integer))).label("user_id"),
+        func.unnest(bindparam("xp", list(awards.values()), type_=ARRAY(Integer))).label("xp"),
+    ).subquery()
+    thresholds = _thresholds()
+
+    # позиция на кривой до начисления + начисленный XP
+    cumulative = thresholds[func.coalesce(User.level, 1)] + func.coalesce(User.current_xp, 0) + grants.c.xp
+    new_level = func.width_bucket(cumulative, thresholds)
+
+    rows = db.execute(
+        update(User)
+        .where(User.id == grants.c.user_id)
+        .values(
+            level=new_level,
+            current_xp=cumulative - thresholds[new_level],
+            total_xp=func.coalesce(User.total_xp, 0) + grants.c.xp,
+        )
+        .returning(User.id, User.level, User.current_xp, User.total_xp)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    return [
+        {"user_id": row.id, "level": row.level, "current_xp": row.current_xp, "total_xp": row.total_xp}
+        for row in rows
+    ]
@@ -0,0 +1,229 @@
+"""Drive the hot API endpoints in-process at a controlled concurrency.
+
+Run from the backend directory against a Postgres with at least one book,
+chapter and active quiz (scripts/generate_dataset.py or
+scripts/import_books.py):
+
+    python -m benchmarks.api_bench --concurrency 16 --requests 2000 --output bench.json
+    python -m benchmarks.api_bench --baseline bench.json --tolerance 10
+
+The app is served through httpx's ASGI transport, so the numbers cover
+routing, validation, the database and serialization, but not sockets or
+uvicorn. Every scenario reports throughput, p50/p95/p99 latency and the
+number of SQL statements per request. Statements are counted with cursor
+events on both engines and attributed to requests through a contextvar.
+
+--output writes the results as JSON. With --baseline, each scenario is
+compared against a stored result, and the script exits with 1 if p95
+latency got worse by more than --tolerance percent.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import platform
+import statistics
+import sys
+import time
+
+import httpx
+from sqlalchemy import event, select
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine, engine
+from app.core.hashing import shutdown_hashing
+from app.models import Book, Chapter, Question, Quiz, QuestionType
+from app.services.quiz_payload import load_quiz_tree
+
+API = settings.API_V1_STR
+PASSWORD = "bench-password"
+SCENARIOS = ("login", "quiz_by_chapter", "submit_quiz", "list_books", "get_chapter")
+
+_statements: contextvars.ContextVar = contextvars.ContextVar("bench_statements", default=None)
+
+
+def _count_statement(*_args, **_kwargs) -> None:
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install_statement_counter() -> None:
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", _count_statement)
+
+
+def correct_answers(quiz) -> list[dict]:
+    """A perfect submission, so the full write path (XP, progress) runs"""
+    answers = []
+    for question in quiz.questions:
+        answer = {"question_id": question.id, "type": question.type.value}
+        if question.type in (QuestionType.SINGLE_CHOICE, QuestionType.MULTI_CHOICE):
+            answer["single_multi"] = {"selected_option_ids": [o.id for o in question.options if o.is_correct]}
+        elif question.type == QuestionType.ORDERING:
+            ordered = sorted(question.options, key=lambda o: o.order_index or 0)
+            answer["ordering"] = {"ordering": [o.id for o in ordered]}
+        elif question.type == QuestionType.MATCHING:
+            answer["matching"] = {"matches": {o.match_key: o.match_key for o in question.options if o.match_key}}
+        answers.append(answer)
+    return answers
+
+
+async def prepare(client: httpx.AsyncClient, users: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        book_id = await db.scalar(select(Book.id).order_by(Book.id).limit(1))
+        chapter_id = await db.scalar(select(Chapter.id).order_by(Chapter.id).limit(1))
+        quiz = await load_quiz_tree(db, Quiz.is_active == True, Quiz.questions.any(Question.id.isnot(None)))
+    if book_id is None or chapter_id is None or quiz is None:
+        raise SystemExit("Need at least one book, chapter and active quiz with questions in the database")
+
+    tokens = []
+    for i in range(users):
+        email = f"bench-{i}@bench.example.com"
+        await client.post(f"{API}/auth/register", json={"email": email, "username": f"bench_{i}", "password": PASSWORD})
+        response = await client.post(f"{API}/auth/login", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+
+    return {
+        "book_id": book_id,
+        "chapter_id": chapter_id,
+        "quiz_id": quiz.id,
+        "quiz_chapter_id": quiz.chapter_id,
+        "submission": {"answers": correct_answers(quiz)},
+        "tokens": tokens,
+    }
+
+
+def request_for(name: str, ctx: dict, worker: int):
+    token = ctx["tokens"][worker % len(ctx["tokens"])]
+    auth = {"Authorization": f"Bearer {token}"}
+    if name == "login":
+        return "POST", f"{API}/auth/login", {"json": {"email": f"bench-{worker % len(ctx['tokens'])}@bench.example.com", "password": PASSWORD}}
+    if name == "quiz_by_chapter":
+        return "GET", f"{API}/quizzes/by-chapter/{ctx['quiz_chapter_id']}", {"headers": auth}
+    if name == "submit_quiz":
+        return "POST", f"{API}/quizzes/{ctx['quiz_id']}/submit", {"headers": auth, "json": ctx["submission"]}
+    if name == "list_books":
+        return "GET", f"{API}/books/", {"params": {"limit": 20}}
+    if name == "get_chapter":
+        return "GET", f"{API}/chapters/{ctx['chapter_id']}", {}
+    raise ValueError(name)
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, ctx: dict, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    statements: list[int] = []
+    errors = 0
+    remaining = total
+
+    async def worker(index: int):
+        nonlocal remaining, errors
+        method, url, kwargs = request_for(name, ctx, index)
+        while remaining > 0:
+            remaining -= 1
+            counter = [0]
+            token = _statements.set(counter)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            finally:
+                latencies.append(time.perf_counter() - start)
+                _statements.reset(token)
+            statements.append(counter[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "sql_per_request": statistics.mean(statements),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    print(f"\n{'scenario':<16} {'p95 base':>9} {'p95 now':>9} {'delta':>8} {'rps base':>9} {'rps now':>9} {'sql':>11}")
+    for name, now in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        delta = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        regressed = delta > tolerance
+        ok = ok and not regressed
+        print(
+            f"{name:<16} {base['p95_ms']:>9.2f} {now['p95_ms']:>9.2f} {delta:>+7.1f}% "
+            f"{base['throughput_rps']:>9.1f} {now['throughput_rps']:>9.1f} "
+            f"{base['sql_per_request']:>4.1f} -> {now['sql_per_request']:<4.1f}{'  REGRESSED' if regressed else ''}"
+        )
+    return ok
+
+
+async def run(args) -> dict:
+    install_statement_counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ctx = await prepare(client, max(args.concurrency, 1))
+        scenarios = {}
+        for name in args.scenarios:
+            await run_scenario(client, name, ctx, args.concurrency, args.warmup)
+            scenarios[name] = await run_scenario(client, name, ctx, args.concurrency, args.requests)
+    return {
+        "meta": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with a JSON file written by --output")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed p95 regression, percent")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_hashing()
+
+    print(f"{'scenario':<16} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8} {'errors':>7}")
+    for name, r in results["scenarios"].items():
+        print(
+            f"{name:<16} {r['throughput_rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['sql_per_request']:>8.1f} {r['errors']:>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
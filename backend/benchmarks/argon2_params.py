@@ -0,0 +1,79 @@
+"""Measure Argon2 hash time for a grid of cost parameters on this machine.
+
+Run from the backend directory:
+
+    python -m benchmarks.argon2_params --target-ms 250
+
+Prints one row per (time_cost, memory_cost, parallelism) combination and the
+strongest combination whose median hash time stays under the target. Put the
+chosen values into ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM.
+Hash time grows with concurrency, so keep PASSWORD_HASH_WORKERS <= CPU cores.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import time
+
+from passlib.hash import argon2
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> dict:
+    hasher = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = hasher.hash("benchmark-password")
+    hash_times, verify_times = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.hash("benchmark-password")
+        hash_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        hasher.verify("benchmark-password", hashed)
+        verify_times.append(time.perf_counter() - start)
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "hash_ms_p50": statistics.median(hash_times) * 1000,
+        "hash_ms_max": max(hash_times) * 1000,
+        "verify_ms_p50": statistics.median(verify_times) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--time-cost", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--memory-cost", type=int, nargs="+", default=[19456, 47104, 65536, 102400], help="KiB")
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [
+        measure(t, m, p, args.rounds)
+        for t, m, p in itertools.product(args.time_cost, args.memory_cost, args.parallelism)
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'time':>4} {'memory KiB':>10} {'par':>3} {'hash p50 ms':>12} {'hash max ms':>12} {'verify p50 ms':>14}")
+        for r in results:
+            print(
+                f"{r['time_cost']:>4} {r['memory_cost']:>10} {r['parallelism']:>3} "
+                f"{r['hash_ms_p50']:>12.1f} {r['hash_ms_max']:>12.1f} {r['verify_ms_p50']:>14.1f}"
+            )
+
+    fitting = [r for r in results if r["hash_ms_p50"] <= args.target_ms]
+    if fitting:
+        best = max(fitting, key=lambda r: (r["memory_cost"] * r["time_cost"], -r["parallelism"]))
+        print(
+            f"\nStrongest under {args.target_ms:.0f} ms: ARGON2_TIME_COST={best['time_cost']} "
+            f"ARGON2_MEMORY_COST={best['memory_cost']} ARGON2_PARALLELISM={best['parallelism']}"
+        )
+    else:
+        print(f"\nNo combination fits under {args.target_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Measure worker cold start: import time and time until the first request is served.
+
+Run from the backend directory:
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --importtime          # slowest imports
+    python -m benchmarks.cold_start --max-ms 1500         # exit 1 when slower
+
+Each run starts a fresh interpreter, so nothing is warm. "import" is how
+long `import app.main` takes. "live" is the time from spawning uvicorn
+until /health answers. "ready" is the time until /health/ready answers,
+which includes the first database connection. Together they bound how
+quickly an autoscaled worker can take traffic.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _wait_for(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.005)
+    return False
+
+
+def measure_boot(timeout: float) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        deadline = started + timeout
+        if not _wait_for(f"{base}/health", deadline):
+            raise SystemExit(f"worker did not become live within {timeout}s")
+        live = time.perf_counter() - started
+        if not _wait_for(f"{base}/health/ready", deadline):
+            raise SystemExit(f"worker did not become ready within {timeout}s (is the database up?)")
+        ready = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {"live": live, "ready": ready}
+
+
+def print_importtime(top: int) -> None:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us | cumulative_us | package.module"
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    print(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for cumulative_us, self_us, name in rows[:top]:
+        print(f"{cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each server")
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    parser.add_argument("--importtime", action="store_true", help="show the slowest imports and exit")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, help="fail when median ready (or import) time exceeds this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.importtime:
+        print_importtime(args.top)
+        return
+
+    samples = {"import": [measure_import() for _ in range(args.runs)]}
+    if not args.skip_server:
+        boots = [measure_boot(args.timeout) for _ in range(args.runs)]
+        samples["live"] = [b["live"] for b in boots]
+        samples["ready"] = [b["ready"] for b in boots]
+
+    results = {
+        name: {"median_ms": statistics.median(values) * 1000, "max_ms": max(values) * 1000}
+        for name, values in samples.items()
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, r in results.items():
+            print(f"{name:<7} median {r['median_ms']:8.1f} ms   max {r['max_ms']:8.1f} ms")
+
+    if args.max_ms is not None:
+        gate = results.get("ready", results["import"])["median_ms"]
+        if gate > args.max_ms:
+            print(f"cold start {gate:.1f} ms exceeds --max-ms {args.max_ms:.1f}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
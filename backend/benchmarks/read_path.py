@@ -0,0 +1,158 @@
+"""Compare the ORM + pydantic read path with the Core + orjson one.
+
+Run from the backend directory against a database with data in it
+(see scripts/import_books.py):
+
+    python -m benchmarks.read_path --rounds 200 --limit 20
+
+For every hot read (book, book list, chapter, chapter list, public quiz)
+both variants run the same query shape in-process, with no HTTP involved.
+"before" hydrates ORM entities, validates them with the response schema
+(from_attributes) and encodes them the way FastAPI does: jsonable_encoder
+plus json.dumps. "after" selects plain rows and passes them to orjson.
+Reported: median and p95 latency in ms, and peak traced allocations in
+KiB per call (tracemalloc, measured in a separate pass so it does not
+skew timings).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.core.responses import dumps
+from app.api.books import BOOK_COLUMNS
+from app.api.chapters import CHAPTER_COLUMNS
+from app.models import Book, Chapter, Quiz
+from app.schemas import Book as BookSchema, Chapter as ChapterSchema, QuizPublic
+from app.services.quiz_payload import load_quiz_tree, fetch_public_quiz
+
+
+def _orm_encode(schema, value) -> bytes:
+    validated = TypeAdapter(schema).validate_python(value, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def cases(book_id: int, chapter_id: int, quiz_chapter_id: int | None, limit: int) -> dict:
+    async def book_orm(db):
+        return _orm_encode(BookSchema, await db.get(Book, book_id))
+
+    async def book_core(db):
+        return dumps((await db.execute(select(*BOOK_COLUMNS).where(Book.id == book_id))).first()._asdict())
+
+    async def books_orm(db):
+        books = (await db.scalars(select(Book).order_by(Book.id).limit(limit))).all()
+        return _orm_encode(list[BookSchema], books)
+
+    async def books_core(db):
+        rows = (await db.execute(select(*BOOK_COLUMNS).order_by(Book.id).limit(limit))).all()
+        return dumps([r._asdict() for r in rows])
+
+    async def chapter_orm(db):
+        return _orm_encode(ChapterSchema, await db.get(Chapter, chapter_id))
+
+    async def chapter_core(db):
+        return dumps((await db.execute(select(*CHAPTER_COLUMNS).where(Chapter.id == chapter_id))).first()._asdict())
+
+    async def chapters_orm(db):
+        chapters = (await db.scalars(
+            select(Chapter).order_by(Chapter.book_id, Chapter.chapter_number, Chapter.id).limit(limit)
+        )).all()
+        return _orm_encode(list[ChapterSchema], chapters)
+
+    async def chapters_core(db):
+        rows = (await db.execute(
+            select(*CHAPTER_COLUMNS).order_by(Chapter.book_id, Chapter.chapter_number, Chapter.id).limit(limit)
+        )).all()
+        return dumps([r._asdict() for r in rows])
+
+    result = {
+        "get_book": (book_orm, book_core),
+        "list_books": (books_orm, books_core),
+        "get_chapter": (chapter_orm, chapter_core),
+        "list_chapters": (chapters_orm, chapters_core),
+    }
+
+    if quiz_chapter_id is not None:
+        async def quiz_orm(db):
+            quiz = await load_quiz_tree(db, Quiz.chapter_id == quiz_chapter_id, Quiz.is_active == True)
+            return QuizPublic.model_validate(quiz).model_dump_json().encode()
+
+        async def quiz_core(db):
+            return dumps(await fetch_public_quiz(db, quiz_chapter_id))
+
+        result["quiz_payload"] = (quiz_orm, quiz_core)
+    return result
+
+
+async def measure(fn, rounds: int) -> dict:
+    times = []
+    for _ in range(rounds):
+        # новая сессия на вызов, как у запроса: identity map не переиспользуется
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db)
+            times.append(time.perf_counter() - start)
+
+    peaks = []
+    for _ in range(min(rounds, 20)):
+        async with AsyncSessionLocal() as db:
+            tracemalloc.start()
+            await fn(db)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    times.sort()
+    return {
+        "p50_ms": statistics.median(times) * 1000,
+        "p95_ms": times[int(len(times) * 0.95) - 1] * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+    }
+
+
+async def run(args) -> list[dict]:
+    async with AsyncSessionLocal() as db:
+        book_id = await db.scalar(select(func.min(Book.id)))
+        chapter_id = await db.scalar(select(Chapter.id).order_by(func.length(Chapter.content).desc()).limit(1))
+        quiz_chapter_id = await db.scalar(select(Quiz.chapter_id).where(Quiz.is_active == True).limit(1))
+    if book_id is None or chapter_id is None:
+        raise SystemExit("Database has no books/chapters to read")
+
+    results = []
+    for name, (before, after) in cases(book_id, chapter_id, quiz_chapter_id, args.limit).items():
+        # прогрев: соединения пула и кэш компиляции запросов
+        for fn in (before, after):
+            await measure(fn, 5)
+        results.append({"case": name, "before": await measure(before, args.rounds), "after": await measure(after, args.rounds)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="page size for list cases")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'case':<14} {'p50 ms':>15} {'p95 ms':>15} {'peak KiB':>17}")
+    for r in results:
+        b, a = r["before"], r["after"]
+        print(
+            f"{r['case']:<14} {b['p50_ms']:>6.2f} -> {a['p50_ms']:<6.2f} {b['p95_ms']:>6.2f} -> {a['p95_ms']:<6.2f} "
+            f"{b['peak_kib']:>7.1f} -> {a['peak_kib']:<7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
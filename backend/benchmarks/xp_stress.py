@@ -0,0 +1,169 @@
+"""Fire concurrent perfect-quiz results at one user and check no XP is lost.
+
+Run from the backend directory against a migrated database:
+
+    python -m benchmarks.xp_stress --submits 500 --concurrency 64 --base-xp 250
+
+A throwaway user is created, then every submit runs apply_quiz_result in
+its own session and transaction, --concurrency at a time, exactly like
+parallel POST /quizzes/{id}/submit calls of one user. All results are
+perfect, so the final state does not depend on commit order:
+
+    reading_streak == submits
+    total_xp       == submits * base_xp + (streak bonuses hit) * STREAK_BONUS_XP
+    level/current_xp match total_xp on the level curve
+    every level was reported as gained exactly once
+
+With --grants every call is grant_xp_batch on the sync engine instead,
+like parallel POST /users/xp-grants batches naming the same user; then
+total_xp must be exactly submits * base_xp, on the level curve, and the
+streak untouched.
+
+Any lost update breaks one of these, and the script exits with 1. The
+user is deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.models import User
+from app.services.xp import apply_quiz_result, grant_xp_batch, level_for_xp, level_threshold, streak_bonus
+
+
+async def create_user() -> int:
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(
+            insert(User)
+            .values(
+                email=f"xp-stress-{tag}@example.invalid", username=f"xp-stress-{tag}",
+                hashed_password="!", level=1, current_xp=0, total_xp=0, reading_streak=0,
+                is_active=False, is_superuser=False,
+            )
+            .returning(User.id)
+        )).scalar_one()
+        await db.commit()
+    return user_id
+
+
+async def run(user_id: int, submits: int, concurrency: int, base_xp: int) -> tuple[list[float], list[dict]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outcomes: list[dict] = []
+
+    async def submit():
+        async with semaphore, AsyncSessionLocal() as db:
+            t0 = time.perf_counter()
+            outcome = await apply_quiz_result(db, user_id, base_xp, is_perfect=True)
+            await db.commit()
+            latencies.append(time.perf_counter() - t0)
+            outcomes.append(outcome)
+
+    await asyncio.gather(*(submit() for _ in range(submits)))
+    return latencies, outcomes
+
+
+async def run_grants(user_id: int, submits: int, concurrency: int, base_xp: int) -> tuple[list[float], list[dict]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    def grant():
+        db = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            grant_xp_batch(db, {user_id: base_xp})
+            db.commit()
+            latencies.append(time.perf_counter() - t0)
+        finally:
+            db.close()
+
+    async def submit():
+        async with semaphore:
+            await asyncio.to_thread(grant)
+
+    await asyncio.gather(*(submit() for _ in range(submits)))
+    return latencies, []
+
+
+def check_grants(row, submits: int, base_xp: int) -> list[str]:
+    failures = []
+    if row.reading_streak != 0:
+        failures.append(f"reading_streak {row.reading_streak} != 0")
+    if row.total_xp != submits * base_xp:
+        failures.append(f"total_xp {row.total_xp} != {submits * base_xp} (lost {submits * base_xp - row.total_xp})")
+    if row.level != level_for_xp(row.total_xp) or level_threshold(row.level) + row.current_xp != row.total_xp:
+        failures.append(f"level {row.level}/current_xp {row.current_xp} off the curve for {row.total_xp} XP")
+    return failures
+
+
+def check(row, outcomes: list[dict], submits: int, base_xp: int) -> list[str]:
+    expected_xp = sum(base_xp + streak_bonus(streak) for streak in range(1, submits + 1))
+    gained = sorted(level for outcome in outcomes for level in outcome["levels_gained"])
+    failures = []
+    if row.reading_streak != submits:
+        failures.append(f"reading_streak {row.reading_streak} != {submits}")
+    if row.total_xp != expected_xp:
+        failures.append(f"total_xp {row.total_xp} != {expected_xp} (lost {expected_xp - row.total_xp})")
+    if sum(outcome["xp_earned"] for outcome in outcomes) != row.total_xp:
+        failures.append("reported xp_earned does not add up to total_xp")
+    if row.level != level_for_xp(row.total_xp) or level_threshold(row.level) + row.current_xp != row.total_xp:
+        failures.append(f"level {row.level}/current_xp {row.current_xp} off the curve for {row.total_xp} XP")
+    if gained != list(range(2, row.level + 1)):
+        failures.append(f"levels reported gained {gained[:10]}... != 2..{row.level}")
+    return failures
+
+
+async def main_async(args) -> int:
+    user_id = await create_user()
+    try:
+        started = time.perf_counter()
+        runner = run_grants if args.grants else run
+        latencies, outcomes = await runner(user_id, args.submits, args.concurrency, args.base_xp)
+        elapsed = time.perf_counter() - started
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(User.level, User.current_xp, User.total_xp, User.reading_streak).where(User.id == user_id)
+            )).one()
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+
+    latencies.sort()
+    print(f"{args.submits} {'grants' if args.grants else 'submits'} at concurrency {args.concurrency}: {args.submits / elapsed:,.0f}/s, "
+          f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"final: level {row.level}, current_xp {row.current_xp}, total_xp {row.total_xp}, "
+          f"streak {row.reading_streak}")
+
+    if args.grants:
+        failures = check_grants(row, args.submits, args.base_xp)
+    else:
+        failures = check(row, outcomes, args.submits, args.base_xp)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    if not failures:
+        print("OK: no lost updates")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submits", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--base-xp", type=int, default=250, help="XP per quiz; large enough to cross levels")
+    parser.add_argument("--grants", action="store_true", help="stress grant_xp_batch instead of apply_quiz_result")
+    args = parser.parse_args()
+    if args.submits < 1 or args.concurrency < 1:
+        parser.error("--submits and --concurrency must be positive")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Baseline schema
+
+The tables exactly as init_db()/create_all built them before migrations
+existed. scripts/migrate.py stamps such databases at this revision
+instead of running it. Everything added since then comes in 0002.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-15
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+difficulty = postgresql.ENUM("BEGINNER", "INTERMEDIATE", "ADVANCED", name="difficultylevel", create_type=False)
+question_type = postgresql.ENUM(
+    "SINGLE_CHOICE", "MULTI_CHOICE", "ORDERING", "MATCHING", name="questiontype", create_type=False
+)
+
+
+def _timestamp(name: str, **kw) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), **kw)
+
+
+def upgrade() -> None:
+    difficulty.create(op.get_bind(), checkfirst=True)
+    question_type.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("email", sa.String, nullable=False),
+        sa.Column("username", sa.String, nullable=False),
+        sa.Column("hashed_password", sa.String, nullable=False),
+        sa.Column("level", sa.Integer),
+        sa.Column("current_xp", sa.Integer),
+        sa.Column("total_xp", sa.Integer),
+        sa.Column("reading_streak", sa.Integer),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("last_reading_date", nullable=True),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("is_superuser", sa.Boolean),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "books",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("author", sa.String, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("cover_image_url", sa.String),
+        sa.Column("genre", sa.String),
+        sa.Column("difficulty", difficulty),
+        sa.Column("total_chapters", sa.Integer),
+        sa.Column("estimated_reading_time", sa.Integer),
+        sa.Column("language", sa.String),
+        sa.Column("chapter_xp", sa.Integer),
+        sa.Column("completion_xp", sa.Integer),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_books_id", "books", ["id"])
+    op.create_index("ix_books_title", "books", ["title"])
+
+    op.create_table(
+        "chapters",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("book_id", sa.Integer, sa.ForeignKey("books.id"), nullable=False),
+        sa.Column("chapter_number", sa.Integer, nullable=False),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("estimated_reading_time", sa.Integer),
+    )
+    op.create_index("ix_chapters_id", "chapters", ["id"])
+
+    op.create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("chapter_id", sa.Integer, sa.ForeignKey("chapters.id"), nullable=False, unique=True),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("quiz_xp", sa.Integer, nullable=True),
+        _timestamp("created_at", server_default=sa.func.now()),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_quizzes_id", "quizzes", ["id"])
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("quiz_id", sa.Integer, sa.ForeignKey("quizzes.id"), nullable=False),
+        sa.Column("type", question_type, nullable=False),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("order_index", sa.Integer),
+        sa.Column("score", sa.Integer),
+    )
+    op.create_index("ix_questions_id", "questions", ["id"])
+
+    op.create_table(
+        "options",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("question_id", sa.Integer, sa.ForeignKey("questions.id"), nullable=False),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("is_correct", sa.Boolean),
+        sa.Column("order_index", sa.Integer, nullable=True),
+        sa.Column("match_key", sa.String, nullable=True),
+        sa.UniqueConstraint("question_id", "order_index", name="uq_option_order_per_question"),
+    )
+    op.create_index("ix_options_id", "options", ["id"])
+
+    op.create_table(
+        "quiz_attempts",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("quiz_id", sa.Integer, sa.ForeignKey("quizzes.id"), nullable=False),
+        _timestamp("started_at", server_default=sa.func.now()),
+        _timestamp("finished_at"),
+        sa.Column("is_perfect", sa.Boolean),
+        sa.Column("score_earned", sa.Integer),
+        sa.Column("total_questions", sa.Integer),
+        sa.Column("correct_questions", sa.Integer),
+    )
+    op.create_index("ix_quiz_attempts_id", "quiz_attempts", ["id"])
+
+    op.create_table(
+        "answers",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("attempt_id", sa.Integer, sa.ForeignKey("quiz_attempts.id"), nullable=False),
+        sa.Column("question_id", sa.Integer, sa.ForeignKey("questions.id"), nullable=False),
+        sa.Column("selected_option_ids", postgresql.JSONB, nullable=True),
+        sa.Column("ordering", postgresql.JSONB, nullable=True),
+        sa.Column("matches", postgresql.JSONB, nullable=True),
+    )
+    op.create_index("ix_answers_id", "answers", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("answers", "quiz_attempts", "options", "questions", "quizzes", "chapters", "books", "users"):
+        op.drop_table(table)
+    question_type.drop(op.get_bind(), checkfirst=True)
+    difficulty.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,137 @@
+"""Reading progress table, full-text search and read-path indexes
+
+Everything added to the models after the baseline. Written to be
+re-runnable (IF NOT EXISTS, DROP TRIGGER IF EXISTS), because development
+databases built with create_all may already have some of it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("reading_progress"):
+        op.create_table(
+            "reading_progress",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("book_id", sa.Integer, sa.ForeignKey("books.id"), nullable=False),
+            sa.Column("current_chapter", sa.Integer),
+            sa.Column("chapters_completed", sa.Integer),
+            sa.Column("status", sa.String),
+            sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_read_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("user_id", "book_id", name="uq_user_book_progress"),
+        )
+        op.create_index("ix_reading_progress_id", "reading_progress", ["id"])
+
+    # Индексы горячих чтений
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_total_xp ON users (total_xp)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_chapters_book_id_chapter_number_id ON chapters (book_id, chapter_number, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reading_progress_user_id_last_read_at ON reading_progress (user_id, last_read_at)"
+    )
+
+    # Полнотекстовый и триграммный поиск (снимок app/models/search.py)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute("ALTER TABLE chapters ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bookquest_ts_config(lang text) RETURNS regconfig
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT CASE lang
+                WHEN 'ru' THEN 'russian'::regconfig WHEN 'en' THEN 'english'::regconfig
+                ELSE 'simple'::regconfig
+            END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.author, '')), 'B') ||
+                setweight(to_tsvector(bookquest_ts_config(NEW.language), coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$;
+
+        DROP TRIGGER IF EXISTS books_search_vector_trg ON books;
+        CREATE TRIGGER books_search_vector_trg
+            BEFORE INSERT OR UPDATE OF title, author, description, language ON books
+            FOR EACH ROW EXECUTE FUNCTION books_search_vector_update();
+
+        CREATE OR REPLACE FUNCTION books_language_reindex_chapters() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE chapters SET title = title WHERE book_id = NEW.id;
+            RETURN NULL;
+        END
+        $$;
+
+        DROP TRIGGER IF EXISTS books_language_reindex_trg ON books;
+        CREATE TRIGGER books_language_reindex_trg
+            AFTER UPDATE OF language ON books
+            FOR EACH ROW WHEN (OLD.language IS DISTINCT FROM NEW.language)
+            EXECUTE FUNCTION books_language_reindex_chapters();
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION chapters_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            cfg regconfig;
+        BEGIN
+            SELECT bookquest_ts_config(language) INTO cfg FROM books WHERE id = NEW.book_id;
+            cfg := coalesce(cfg, 'simple'::regconfig);
+            NEW.search_vector :=
+                setweight(to_tsvector(cfg, coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector(cfg, left(NEW.content, 500000)), 'D');
+            RETURN NEW;
+        END
+        $$;
+
+        DROP TRIGGER IF EXISTS chapters_search_vector_trg ON chapters;
+        CREATE TRIGGER chapters_search_vector_trg
+            BEFORE INSERT OR UPDATE OF title, content, book_id ON chapters
+            FOR EACH ROW EXECUTE FUNCTION chapters_search_vector_update();
+    """)
+
+    # Заполняем векторы существующих строк через те же триггеры
+    op.execute("UPDATE books SET title = title WHERE search_vector IS NULL")
+    op.execute("UPDATE chapters SET title = title WHERE search_vector IS NULL")
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_books_search_vector ON books USING gin (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING gin (title gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_books_author_trgm ON books USING gin (author gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_chapters_search_vector ON chapters USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS chapters_search_vector_trg ON chapters")
+    op.execute("DROP TRIGGER IF EXISTS books_language_reindex_trg ON books")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_trg ON books")
+    op.execute("DROP FUNCTION IF EXISTS chapters_search_vector_update()")
+    op.execute("DROP FUNCTION IF EXISTS books_language_reindex_chapters()")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_update()")
+    op.execute("DROP FUNCTION IF EXISTS bookquest_ts_config(text)")
+    for index in (
+        "ix_chapters_search_vector", "ix_books_author_trgm", "ix_books_title_trgm", "ix_books_search_vector",
+        "ix_reading_progress_user_id_last_read_at", "ix_chapters_book_id_chapter_number_id", "ix_users_total_xp",
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    op.execute("ALTER TABLE chapters DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE books DROP COLUMN IF EXISTS search_vector")
+    op.drop_table("reading_progress")
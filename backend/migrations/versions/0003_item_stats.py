@@ -0,0 +1,38 @@
+"""Per-question and per-option item statistics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_stats",
+        sa.Column("question_id", sa.Integer, sa.ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("correct", sa.Integer, nullable=False),
+        sa.Column("score_sum", sa.Float, nullable=False),
+        sa.Column("score_sq_sum", sa.Float, nullable=False),
+        sa.Column("score_sum_correct", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "option_stats",
+        sa.Column("option_id", sa.Integer, sa.ForeignKey("options.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("question_id", sa.Integer, sa.ForeignKey("questions.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("picks", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_option_stats_question_id", "option_stats", ["question_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("option_stats")
+    op.drop_table("question_stats")
@@ -0,0 +1,160 @@
+"""Partition quiz_attempts and answers by month, add history indexes
+
+Existing rows are copied into the new partitioned tables in one
+transaction, so this takes a write lock on both tables for the duration of
+the copy. Databases created by create_all from the current models are
+already partitioned and only get their missing partitions.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-27
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Снимок app/models/partitions.py на момент миграции
+MONTHS_AHEAD = 3
+INDEXES = (
+    ("ix_quiz_attempts_id", "quiz_attempts", "id"),
+    ("ix_quiz_attempts_user_id_started_at", "quiz_attempts", "user_id, started_at"),
+    ("ix_quiz_attempts_user_id_quiz_id_started_at", "quiz_attempts", "user_id, quiz_id, started_at"),
+    ("ix_quiz_attempts_quiz_id_started_at", "quiz_attempts", "quiz_id, started_at"),
+    ("ix_answers_id", "answers", "id"),
+    ("ix_answers_attempt_id", "answers", "attempt_id"),
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(first: date, last: date) -> None:
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        bounds = f"FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')"
+        for table in ("quiz_attempts", "answers"):
+            op.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_y{month.year:04d}m{month.month:02d} "
+                f"PARTITION OF {table} FOR VALUES {bounds}"
+            )
+        month = _add_months(month, 1)
+    for table in ("quiz_attempts", "answers"):
+        op.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE relname = :table AND relkind IN ('r', 'p')"),
+        {"table": table},
+    ).scalar() or False
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    today = datetime.now(timezone.utc).date()
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+
+    if _is_partitioned(bind, "quiz_attempts"):
+        _create_partitions(today, last)
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        return
+
+    # Старые таблицы уходят в сторону вместе с именами своих индексов
+    op.execute("ALTER TABLE answers RENAME TO answers_legacy")
+    op.execute("ALTER TABLE quiz_attempts RENAME TO quiz_attempts_legacy")
+    for index in ("quiz_attempts_pkey", "ix_quiz_attempts_id", "answers_pkey", "ix_answers_id"):
+        op.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy")
+
+    op.execute("""
+        CREATE TABLE quiz_attempts (
+            id integer NOT NULL DEFAULT nextval('quiz_attempts_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id),
+            quiz_id integer NOT NULL REFERENCES quizzes (id),
+            started_at timestamptz NOT NULL DEFAULT now(),
+            finished_at timestamptz,
+            is_perfect boolean,
+            score_earned integer,
+            total_questions integer,
+            correct_questions integer,
+            CONSTRAINT quiz_attempts_pkey PRIMARY KEY (id, started_at)
+        ) PARTITION BY RANGE (started_at)
+    """)
+    op.execute("""
+        CREATE TABLE answers (
+            id integer NOT NULL DEFAULT nextval('answers_id_seq'),
+            attempt_id integer NOT NULL,
+            attempt_started_at timestamptz NOT NULL,
+            question_id integer NOT NULL REFERENCES questions (id),
+            selected_option_ids jsonb,
+            ordering jsonb,
+            matches jsonb,
+            CONSTRAINT answers_pkey PRIMARY KEY (id, attempt_started_at),
+            FOREIGN KEY (attempt_id, attempt_started_at)
+                REFERENCES quiz_attempts (id, started_at) ON DELETE CASCADE
+        ) PARTITION BY RANGE (attempt_started_at)
+    """)
+    # Последовательности переезжают к новым таблицам и переживут DROP старых
+    op.execute("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY quiz_attempts.id")
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+
+    first = bind.execute(
+        sa.text("SELECT min(coalesce(started_at, finished_at)) FROM quiz_attempts_legacy")
+    ).scalar()
+    _create_partitions(first.date() if first else today, last)
+
+    op.execute("""
+        INSERT INTO quiz_attempts (id, user_id, quiz_id, started_at, finished_at, is_perfect,
+                                   score_earned, total_questions, correct_questions)
+        SELECT id, user_id, quiz_id, coalesce(started_at, finished_at, now()), finished_at, is_perfect,
+               score_earned, total_questions, correct_questions
+        FROM quiz_attempts_legacy
+    """)
+    op.execute("""
+        INSERT INTO answers (id, attempt_id, attempt_started_at, question_id,
+                             selected_option_ids, ordering, matches)
+        SELECT a.id, a.attempt_id, t.started_at, a.question_id, a.selected_option_ids, a.ordering, a.matches
+        FROM answers_legacy a JOIN quiz_attempts t ON t.id = a.attempt_id
+    """)
+    op.execute("DROP TABLE answers_legacy")
+    op.execute("DROP TABLE quiz_attempts_legacy")
+
+    # Индексы строим после копирования: так быстрее, чем поддерживать их при вставке
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+    op.execute("ANALYZE quiz_attempts")
+    op.execute("ANALYZE answers")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE quiz_attempts_plain (LIKE quiz_attempts INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO quiz_attempts_plain SELECT * FROM quiz_attempts")
+    op.execute("CREATE TABLE answers_plain (LIKE answers INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO answers_plain SELECT * FROM answers")
+    op.execute("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE answers")
+    op.execute("DROP TABLE quiz_attempts")
+
+    op.execute("ALTER TABLE quiz_attempts_plain RENAME TO quiz_attempts")
+    op.execute("ALTER TABLE quiz_attempts ALTER COLUMN started_at DROP NOT NULL")
+    op.execute("ALTER TABLE quiz_attempts ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE quiz_attempts ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE quiz_attempts ADD FOREIGN KEY (quiz_id) REFERENCES quizzes (id)")
+    op.execute("ALTER TABLE answers_plain RENAME TO answers")
+    op.execute("ALTER TABLE answers DROP COLUMN attempt_started_at")
+    op.execute("ALTER TABLE answers ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE answers ADD FOREIGN KEY (attempt_id) REFERENCES quiz_attempts (id)")
+    op.execute("ALTER TABLE answers ADD FOREIGN KEY (question_id) REFERENCES questions (id)")
+    op.execute("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY quiz_attempts.id")
+    op.execute("ALTER SEQUENCE answers_id_seq OWNED BY answers.id")
+    op.execute("CREATE INDEX ix_quiz_attempts_id ON quiz_attempts (id)")
+    op.execute("CREATE INDEX ix_answers_id ON answers (id)")
@@ -0,0 +1,33 @@
+"""Stored byte length and md5 of chapter content
+
+Both are generated columns, so every write path (ORM, COPY import, manual
+UPDATE) keeps them in step with `content`. Adding them rewrites the
+chapters table once.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-02-10
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chapters",
+        sa.Column("content_bytes", sa.Integer, sa.Computed("octet_length(content)", persisted=True)),
+    )
+    op.add_column(
+        "chapters",
+        sa.Column("content_md5", sa.String(32), sa.Computed("md5(content)", persisted=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chapters", "content_md5")
+    op.drop_column("chapters", "content_bytes")
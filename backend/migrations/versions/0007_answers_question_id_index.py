@@ -0,0 +1,25 @@
+"""Index answers by question
+
+Removing a question from a quiz checks for answers to it, and so does
+the answers -> questions foreign key on DELETE. Without this index both
+scan every monthly partition. Created on the partitioned parent, so
+existing and future partitions get it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-02-12
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_answers_question_id", "answers", ["question_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_answers_question_id", table_name="answers")
@@ -0,0 +1,291 @@
+"""Fill the database with a deterministic synthetic dataset for load tests.
+
+Run from the backend directory:
+
+    python -m scripts.generate_dataset --seed 42 --users 200000 --books 2000 \\
+        --chapters-per-book 25 --attempts 3000000 --truncate
+
+Every table is streamed into Postgres with COPY (app.core.bulk.copy_rows)
+using explicit ids, so no rows are buffered and foreign keys can be
+computed instead of read back. Sequences are advanced with setval at the
+end. The same --seed and scale factors always produce the same rows.
+Each table draws from its own RNG stream, so changing one scale factor
+does not reshuffle the others.
+
+Every chapter gets one quiz whose questions cycle through all four
+QuestionTypes. Each attempt writes one answer per question, so the
+answers table has --attempts * --questions-per-quiz rows. All users share
+the password "password".
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.bulk import copy_rows
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models import DifficultyLevel, QuestionType
+from app.models.partitions import ensure_partitions
+from app.services.xp import level_for_xp, level_threshold
+
+OPTIONS_PER_QUESTION = 4
+QUESTION_TYPES = list(QuestionType)
+LANGUAGES = (("ru", 0.6), ("kk", 0.25), ("en", 0.15))
+GENRES = ("classic", "fantasy", "detective", "science", "history", "poetry", "adventure")
+TABLES = (
+    "users", "books", "chapters", "quizzes", "questions", "options",
+    "quiz_attempts", "answers", "reading_progress",
+)
+
+_SYLLABLES = ("ка", "ла", "ми", "но", "ра", "са", "то", "ве", "ди", "ко", "ан", "ер", "ол", "ут", "ин", "ба")
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)  # фиксированная точка: воспроизводимые даты
+
+
+def _vocabulary(rng: random.Random, size: int = 5000) -> list[str]:
+    return ["".join(rng.choices(_SYLLABLES, k=rng.randint(1, 4))) for _ in range(size)]
+
+
+class Dataset:
+    def __init__(self, args, base_ids: dict[str, int]):
+        self.args = args
+        self.base = base_ids
+        self.n_chapters = args.books * args.chapters_per_book
+        self.n_questions = self.n_chapters * args.questions_per_quiz
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f"{self.args.seed}:{table}")
+
+    # Вычисляемые id: строки ссылаются друг на друга без чтения из БД
+    def user_id(self, i: int) -> int: return self.base["users"] + i + 1
+    def book_id(self, i: int) -> int: return self.base["books"] + i + 1
+    def chapter_id(self, i: int) -> int: return self.base["chapters"] + i + 1
+    def quiz_id(self, i: int) -> int: return self.base["quizzes"] + i + 1
+    def question_id(self, i: int) -> int: return self.base["questions"] + i + 1
+    def option_id(self, question: int, k: int) -> int: return self.base["options"] + question * OPTIONS_PER_QUESTION + k + 1
+
+    def users(self):
+        rng = self.rng("users")
+        password = get_password_hash("password")
+        for i in range(self.args.users):
+            total_xp = min(int(rng.paretovariate(1.3) * 300) - 300, 5_000_000)
+            level = level_for_xp(total_xp)
+            created = _NOW - timedelta(days=rng.uniform(0, self.args.days))
+            uid = self.user_id(i)
+            yield (
+                uid, f"user{uid}@example.com", f"user{uid}", password,
+                level, total_xp - level_threshold(level), total_xp, rng.randint(0, 60),
+                created, created + timedelta(days=rng.uniform(0, (_NOW - created).days)), True, False,
+            )
+
+    def books(self):
+        rng = self.rng("books")
+        vocab = _vocabulary(rng, 2000)
+        languages, weights = zip(*LANGUAGES)
+        for i in range(self.args.books):
+            yield (
+                self.book_id(i),
+                " ".join(rng.choices(vocab, k=rng.randint(1, 5))).capitalize(),
+                " ".join(rng.choices(vocab, k=2)).title(),
+                " ".join(rng.choices(vocab, k=40)),
+                rng.choice(GENRES),
+                rng.choice(list(DifficultyLevel)).name,
+                self.args.chapters_per_book,
+                self.args.chapters_per_book * max(1, self.args.chapter_words // 200),
+                rng.choices(languages, weights)[0],
+                100, 500, _NOW - timedelta(days=rng.uniform(0, self.args.days)),
+            )
+
+    def chapters(self):
+        rng = self.rng("chapters")
+        vocab = _vocabulary(rng)
+        words = self.args.chapter_words
+        for i in range(self.n_chapters):
+            paragraphs = []
+            remaining = max(1, int(words * rng.uniform(0.7, 1.3)))
+            while remaining > 0:
+                n = min(remaining, rng.randint(40, 120))
+                paragraphs.append(" ".join(rng.choices(vocab, k=n)).capitalize() + ".")
+                remaining -= n
+            yield (
+                self.chapter_id(i),
+                self.book_id(i // self.args.chapters_per_book),
+                i % self.args.chapters_per_book + 1,
+                f"Глава {i % self.args.chapters_per_book + 1}",
+                "\n\n".join(paragraphs),
+                max(1, words // 200),
+            )
+
+    def quizzes(self):
+        for i in range(self.n_chapters):
+            yield (self.quiz_id(i), self.chapter_id(i), f"Тест к главе {i % self.args.chapters_per_book + 1}", None, True, None, _NOW)
+
+    def question_type(self, q: int) -> QuestionType:
+        return QUESTION_TYPES[q % self.args.questions_per_quiz % len(QUESTION_TYPES)]
+
+    def questions(self):
+        rng = self.rng("questions")
+        vocab = _vocabulary(rng, 1000)
+        per_quiz = self.args.questions_per_quiz
+        for q in range(self.n_questions):
+            yield (
+                self.question_id(q), self.quiz_id(q // per_quiz), self.question_type(q).name,
+                " ".join(rng.choices(vocab, k=8)).capitalize() + "?", q % per_quiz, 1,
+            )
+
+    # Правильный ответ выводится из номера вопроса, поэтому его не нужно хранить
+    def correct_option(self, q: int) -> int:
+        return q % OPTIONS_PER_QUESTION
+
+    def options(self):
+        rng = self.rng("options")
+        vocab = _vocabulary(rng, 1000)
+        for q in range(self.n_questions):
+            qtype, correct = self.question_type(q), self.correct_option(q)
+            for k in range(OPTIONS_PER_QUESTION):
+                is_correct = (
+                    k == correct if qtype == QuestionType.SINGLE_CHOICE
+                    else k in (correct, (correct + 1) % OPTIONS_PER_QUESTION) if qtype == QuestionType.MULTI_CHOICE
+                    else False
+                )
+                yield (
+                    self.option_id(q, k), self.question_id(q), " ".join(rng.choices(vocab, k=3)),
+                    is_correct, (k + q) % OPTIONS_PER_QUESTION,
+                    f"m{k}" if qtype == QuestionType.MATCHING else None,
+                )
+
+    def answer_payload(self, q: int, correct: bool) -> tuple:
+        qtype, c = self.question_type(q), self.correct_option(q)
+        n = OPTIONS_PER_QUESTION
+        if qtype == QuestionType.SINGLE_CHOICE:
+            return json.dumps([self.option_id(q, c if correct else (c + 1) % n)]), None, None
+        if qtype == QuestionType.MULTI_CHOICE:
+            picked = (c, (c + 1) % n) if correct else (c,)
+            return json.dumps([self.option_id(q, k) for k in picked]), None, None
+        if qtype == QuestionType.ORDERING:
+            ordering = [self.option_id(q, k) for k in sorted(range(n), key=lambda k: (k + q) % n)]
+            return None, json.dumps(ordering if correct else ordering[::-1]), None
+        matches = {f"m{k}": f"m{k}" for k in range(n)}
+        if not correct:
+            matches["m0"], matches["m1"] = "m1", "m0"
+        return None, None, json.dumps(matches)
+
+    def _attempts(self):
+        """(attempt row, first question index, per-question correctness); re-iterable with the same output"""
+        rng = self.rng("attempts")
+        per_quiz = self.args.questions_per_quiz
+        power_users = max(1, self.args.users // 20)
+        for a in range(self.args.attempts):
+            # 30% попыток — у 5% самых активных пользователей
+            user = rng.randrange(power_users) if rng.random() < 0.3 else rng.randrange(self.args.users)
+            quiz = rng.randrange(self.n_chapters)
+            skill = rng.uniform(0.4, 1.0)
+            correct = [rng.random() < skill for _ in range(per_quiz)]
+            started = _NOW - timedelta(seconds=rng.uniform(0, self.args.days * 86400))
+            perfect = all(correct)
+            row = (
+                self.base["quiz_attempts"] + a + 1, self.user_id(user), self.quiz_id(quiz),
+                started, started + timedelta(seconds=rng.randint(30, 900)),
+                perfect, 100 if perfect else 0, per_quiz, sum(correct),
+            )
+            yield row, quiz * per_quiz, correct
+
+    def quiz_attempts(self):
+        for row, _, _ in self._attempts():
+            yield row
+
+    def answers(self):
+        answer_id = self.base["answers"]
+        for row, first_question, correct in self._attempts():
+            for j, ok in enumerate(correct):
+                answer_id += 1
+                yield (
+                    answer_id, row[0], row[3], self.question_id(first_question + j),
+                    *self.answer_payload(first_question + j, ok),
+                )
+
+    def reading_progress(self):
+        rng = self.rng("reading_progress")
+        per_user = min(self.args.progress_per_user, self.args.books)
+        progress_id = self.base["reading_progress"]
+        for i in range(self.args.users):
+            for b in rng.sample(range(self.args.books), per_user):
+                progress_id += 1
+                done = rng.randint(0, self.args.chapters_per_book)
+                finished = done == self.args.chapters_per_book
+                last_read = _NOW - timedelta(days=rng.uniform(0, self.args.days))
+                yield (
+                    progress_id, self.user_id(i), self.book_id(b),
+                    min(done + 1, self.args.chapters_per_book), done, "completed" if finished else "reading",
+                    last_read - timedelta(days=30), last_read if finished else None, last_read,
+                )
+
+
+COLUMNS = {
+    "users": ("id", "email", "username", "hashed_password", "level", "current_xp", "total_xp",
+              "reading_streak", "created_at", "last_reading_date", "is_active", "is_superuser"),
+    "books": ("id", "title", "author", "description", "genre", "difficulty", "total_chapters",
+              "estimated_reading_time", "language", "chapter_xp", "completion_xp", "created_at"),
+    "chapters": ("id", "book_id", "chapter_number", "title", "content", "estimated_reading_time"),
+    "quizzes": ("id", "chapter_id", "title", "description", "is_active", "quiz_xp", "created_at"),
+    "questions": ("id", "quiz_id", "type", "text", "order_index", "score"),
+    "options": ("id", "question_id", "text", "is_correct", "order_index", "match_key"),
+    "quiz_attempts": ("id", "user_id", "quiz_id", "started_at", "finished_at", "is_perfect",
+                      "score_earned", "total_questions", "correct_questions"),
+    "answers": ("id", "attempt_id", "attempt_started_at", "question_id", "selected_option_ids", "ordering", "matches"),
+    "reading_progress": ("id", "user_id", "book_id", "current_chapter", "chapters_completed", "status",
+                         "started_at", "completed_at", "last_read_at"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--books", type=int, default=1_000)
+    parser.add_argument("--chapters-per-book", type=int, default=20)
+    parser.add_argument("--chapter-words", type=int, default=3_000)
+    parser.add_argument("--questions-per-quiz", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=2_000_000)
+    parser.add_argument("--progress-per-user", type=int, default=3)
+    parser.add_argument("--days", type=int, default=365, help="time span of generated timestamps")
+    parser.add_argument("--truncate", action="store_true", help="empty all tables first instead of appending")
+    args = parser.parse_args()
+    if min(args.users, args.books, args.chapters_per_book, args.questions_per_quiz) < 1:
+        parser.error("scale factors must be positive")
+
+    db = SessionLocal()
+    try:
+        if args.truncate:
+            db.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+            db.commit()
+        base_ids = {t: db.execute(text(f"SELECT coalesce(max(id), 0) FROM {t}")).scalar_one() for t in TABLES}
+        dataset = Dataset(args, base_ids)
+        # Все месяцы сгенерированных попыток получают свои секции, а не DEFAULT
+        ensure_partitions(db, (_NOW - timedelta(days=args.days)).date(), _NOW.date())
+        db.commit()
+
+        started = time.perf_counter()
+        for table in TABLES:
+            t0 = time.perf_counter()
+            count = copy_rows(db.connection(), table, COLUMNS[table], getattr(dataset, table)())
+            db.commit()
+            print(f"{table:<17} {count:>12,} rows  {time.perf_counter() - t0:8.1f}s", flush=True)
+
+        for table in TABLES:
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+            ))
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+        print(f"\nDone in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
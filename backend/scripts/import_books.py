@@ -0,0 +1,101 @@
+"""Bulk-import books from TXT, Markdown and EPUB files.
+
+Run from the backend directory:
+
+    python -m scripts.import_books catalog/ --language kk --genre classic
+
+Directories are walked recursively. Each book is imported in its own
+transaction (book row, COPY of its chapters, totals), so a broken file is
+reported and skipped without losing the rest of the catalog. Title and
+author come from EPUB metadata, otherwise from an "Author - Title" file
+name; --author/--title override both for single-file imports.
+"""
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import SessionLocal
+from app.models import DifficultyLevel
+from app.services.book_import import (
+    SUPPORTED_FORMATS,
+    BookImportError,
+    detect_format,
+    import_book,
+    iter_chapters,
+    read_epub_metadata,
+)
+
+
+def iter_sources(paths: list[str]):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lstrip(".").lower() in SUPPORTED_FORMATS + ("markdown",):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def book_fields(path: str, fmt: str, handle, args) -> dict:
+    meta = read_epub_metadata(handle) if fmt == "epub" else None
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name_author, _, name_title = stem.partition(" - ")
+    if not name_title:
+        name_author, name_title = None, stem
+    return {
+        "title": args.title or (meta and meta.title) or name_title.strip(),
+        "author": args.author or (meta and meta.author) or (name_author and name_author.strip()) or "Unknown",
+        "description": meta and meta.description,
+        "language": args.language or (meta and meta.language) or "ru",
+        "genre": args.genre,
+        "difficulty": args.difficulty,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="files or directories")
+    parser.add_argument("--title")
+    parser.add_argument("--author")
+    parser.add_argument("--language", help="ru, kk or en (default: from EPUB, else ru)")
+    parser.add_argument("--genre")
+    parser.add_argument("--difficulty", type=DifficultyLevel, default=DifficultyLevel.INTERMEDIATE)
+    args = parser.parse_args()
+
+    imported = failed = 0
+    started = time.perf_counter()
+    for path in iter_sources(args.paths):
+        db = SessionLocal()
+        try:
+            fmt = detect_format(path)
+            with open(path, "rb") as handle:
+                fields = book_fields(path, fmt, handle, args)
+                handle.seek(0)
+                result = import_book(db, fields, iter_chapters(handle, fmt))
+            db.commit()
+        except (BookImportError, OSError, SQLAlchemyError, psycopg2.Error) as exc:
+            db.rollback()
+            failed += 1
+            print(f"FAIL {path}: {exc}", file=sys.stderr)
+            continue
+        finally:
+            db.close()
+        imported += 1
+        print(
+            f"ok   {path}: book_id={result.book_id} chapters={result.total_chapters} "
+            f"words={result.total_words} minutes={result.estimated_reading_time}"
+        )
+
+    elapsed = time.perf_counter() - started
+    print(f"\nImported {imported} book(s), {failed} failed, in {elapsed:.1f}s")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
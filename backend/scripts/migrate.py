@@ -0,0 +1,60 @@
+"""Apply database migrations; run once per deploy, not from the app workers.
+
+Run from the backend directory:
+
+    python -m scripts.migrate            # upgrade to the latest revision
+    python -m scripts.migrate --sql      # print the SQL instead of running it
+    python -m scripts.migrate --target 0002
+
+A database created by the old create_all-on-startup path has tables but
+no alembic_version. Such a database is stamped at the baseline revision
+first, so only the later migrations run against it. Concurrent
+invocations are serialised by an advisory lock in migrations/env.py.
+"""
+import argparse
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, pool
+
+from app.core.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def is_unversioned_legacy_schema() -> bool:
+    engine = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    return "users" in tables and "alembic_version" not in tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="head", help="revision to upgrade to (default: head)")
+    parser.add_argument("--sql", action="store_true", help="offline mode: print SQL, touch nothing")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if args.sql:
+        command.upgrade(config, args.target, sql=True)
+        return
+
+    if is_unversioned_legacy_schema():
+        print(f"Existing schema without alembic_version: stamping baseline {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Maintain the monthly partitions of quiz_attempts and answers.
+
+Run from the backend directory, e.g. daily from cron:
+
+    python -m scripts.partitions                     # create months ahead
+    python -m scripts.partitions --retain-months 24  # and drop older ones
+
+Creates the partitions from the current month up to
+ATTEMPT_PARTITIONS_AHEAD months ahead, so rows never land in the default
+partition. With --retain-months (or ATTEMPT_RETENTION_MONTHS) whole
+months older than that are detached and dropped, which is instant
+compared to a DELETE. Exits with status 1 if the default partitions hold
+rows: new months overlapping them cannot be created until they are moved.
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.partitions import (
+    add_months,
+    default_partition_rows,
+    drop_partitions_before,
+    ensure_partitions,
+    month_start,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=settings.ATTEMPT_PARTITIONS_AHEAD,
+                        help="months to create after the current one")
+    parser.add_argument("--retain-months", type=int, default=settings.ATTEMPT_RETENTION_MONTHS,
+                        help="drop months older than this many (default: keep everything)")
+    args = parser.parse_args()
+    if args.ahead < 0 or (args.retain_months is not None and args.retain_months < 1):
+        parser.error("--ahead must be >= 0 and --retain-months >= 1")
+
+    current = month_start(datetime.now(timezone.utc).date())
+    with engine.begin() as connection:
+        for name in ensure_partitions(connection, current, add_months(current, args.ahead)):
+            print(f"created {name}")
+        if args.retain_months is not None:
+            for name in drop_partitions_before(connection, add_months(current, 1 - args.retain_months)):
+                print(f"dropped {name}")
+        stray = default_partition_rows(connection)
+
+    if stray:
+        print(f"warning: {stray} rows in the default partitions", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
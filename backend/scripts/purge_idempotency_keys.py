@@ -0,0 +1,36 @@
+"""Delete stored Idempotency-Key results older than IDEMPOTENCY_KEY_TTL_HOURS.
+
+Run from the backend directory, e.g. hourly from cron:
+
+    python -m scripts.purge_idempotency_keys
+    python -m scripts.purge_idempotency_keys --ttl-hours 48
+
+Rows are deleted in batches, each in its own short transaction, so the
+purge never holds locks that block submissions for long. A retry that
+arrives after its key was purged is handled as a new request.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.idempotency import purge_keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttl-hours", type=float, default=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=args.ttl_hours)
+    db = SessionLocal()
+    try:
+        deleted = purge_keys(db, cutoff, args.batch_size)
+    finally:
+        db.close()
+    print(f"deleted {deleted} idempotency keys created before {cutoff:%Y-%m-%d %H:%M} UTC")
+
+
+if __name__ == "__main__":
+    main()